@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import router
+
+
+def user_cache_key(user_id):
+    return f"accounts:employee:{user_id}"
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that keeps each authenticated Employee row in the cache for
+    ACCOUNTS_USER_CACHE_TIMEOUT seconds. Saving or deleting an Employee drops
+    its entry, see accounts.signals.
+
+    The password hash is never cached: the restored Employee leaves it
+    deferred and carries the session hash derived from it instead.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return self.restore_user(*cached)
+        user = super().get_user(user_id)
+        if user is not None:
+            cache.set(key, self.cached_user(user), settings.ACCOUNTS_USER_CACHE_TIMEOUT)
+        return user
+
+    def cached_user(self, user):
+        values = {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.attname != "password"
+        }
+        return values, user.get_session_auth_hash()
+
+    def restore_user(self, values, session_auth_hash):
+        UserModel = get_user_model()
+        user = UserModel.from_db(
+            router.db_for_read(UserModel), list(values), list(values.values())
+        )
+        user._session_auth_hash = session_auth_hash
+        return user
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Each process keeps its own copy, so logging out or changing an employee on
+# one worker would go unnoticed by the others.
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+CACHED_SESSION_ENGINES = {
+    "django.contrib.sessions.backends.cache",
+    "django.contrib.sessions.backends.cached_db",
+}
+CACHED_AUTHENTICATION_BACKEND = "accounts.backends.CachedModelBackend"
+
+
+def is_process_local(alias):
+    return settings.CACHES[alias]["BACKEND"] in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG:
+        return []
+    errors = []
+    if settings.SESSION_ENGINE in CACHED_SESSION_ENGINES and is_process_local(
+        settings.SESSION_CACHE_ALIAS
+    ):
+        errors.append(
+            Error(
+                f"SESSION_ENGINE {settings.SESSION_ENGINE!r} needs a cache shared "
+                "by every worker.",
+                hint="Set CACHE_BACKEND to a shared backend, or use "
+                "django.contrib.sessions.backends.db.",
+                id="accounts.E001",
+            )
+        )
+    if CACHED_AUTHENTICATION_BACKEND in settings.AUTHENTICATION_BACKENDS and (
+        is_process_local("default")
+    ):
+        errors.append(
+            Error(
+                f"{CACHED_AUTHENTICATION_BACKEND} needs a cache shared by every "
+                "worker.",
+                hint="Set CACHE_BACKEND to a shared backend, or use "
+                "django.contrib.auth.backends.ModelBackend.",
+                id="accounts.E002",
+            )
+        )
+    return errors
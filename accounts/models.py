@@ -12,6 +12,15 @@ class Employee(AbstractUser):
         max_length=20, choices=AccountType, null=False, blank=False
     )
 
+    def get_session_auth_hash(self):
+        # Employees restored from the user cache (accounts.backends) have no
+        # password loaded, only the hash computed from it.
+        if "password" in self.get_deferred_fields():
+            cached = getattr(self, "_session_auth_hash", None)
+            if cached is not None:
+                return cached
+        return super().get_session_auth_hash()
+
     def save(self, *args, **kwargs):
         if not self.pk:
             return super().save(*args, **kwargs)
@@ -1,3 +1,104 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from django.urls import reverse
+from .backends import user_cache_key
+from .checks import check_shared_cache
 
-# Create your tests here.
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+CACHED_AUTH_SETTINGS = {
+    "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+    "AUTHENTICATION_BACKENDS": ["accounts.backends.CachedModelBackend"],
+}
+
+
+@override_settings(**CACHED_AUTH_SETTINGS)
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = get_user_model().objects.create_user(
+            username="test_owner", password="test_password", account_type="owner"
+        )
+        self.client.force_login(self.user)
+
+    def test_warm_portal_request_runs_no_queries(self):
+        self.client.get(reverse("portal"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("portal"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["user"].account_type, "owner")
+
+    def test_redirect_only_request_runs_no_queries(self):
+        self.client.get(reverse("portal"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("delete", kwargs={"item_id": 1}))
+
+        self.assertRedirects(response, reverse("portal"))
+
+    def test_cold_user_cache_reads_employee_once(self):
+        self.client.get(reverse("portal"))
+        cache.delete(user_cache_key(self.user.pk))
+
+        with self.assertNumQueries(1):
+            self.client.get(reverse("portal"))
+        with self.assertNumQueries(0):
+            self.client.get(reverse("portal"))
+
+    def test_cached_user_leaves_out_the_password_hash(self):
+        self.client.get(reverse("portal"))
+        values, session_auth_hash = cache.get(user_cache_key(self.user.pk))
+
+        self.assertNotIn("password", values)
+        self.assertNotIn(self.user.password, repr(values))
+        self.assertEqual(session_auth_hash, self.user.get_session_auth_hash())
+
+        response = self.client.get(reverse("portal"))
+        user = response.context["user"]
+        self.assertEqual(user.get_deferred_fields(), {"password"})
+        self.assertEqual(user.get_session_auth_hash(), session_auth_hash)
+
+    def test_deleting_employee_invalidates_cached_user(self):
+        self.client.get(reverse("portal"))
+        self.user.delete()
+
+        response = self.client.get(reverse("portal"))
+
+        self.assertRedirects(response, reverse("login"))
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_configured_settings_pass(self):
+        self.assertEqual(run_checks(tags=["caches"]), [])
+
+    @override_settings(DEBUG=False, CACHES=LOCMEM_CACHES, **CACHED_AUTH_SETTINGS)
+    def test_process_local_cache_is_rejected(self):
+        errors = check_shared_cache(None)
+
+        self.assertEqual(
+            [error.id for error in errors], ["accounts.E001", "accounts.E002"]
+        )
+
+    @override_settings(
+        DEBUG=False,
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": "/tmp/pizza-portal-check",
+            }
+        },
+        **CACHED_AUTH_SETTINGS,
+    )
+    def test_shared_cache_is_accepted(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(DEBUG=True, CACHES=LOCMEM_CACHES, **CACHED_AUTH_SETTINGS)
+    def test_debug_allows_process_local_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
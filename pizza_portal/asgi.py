@@ -12,5 +12,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pizza_portal.settings")
+os.environ.setdefault("PORTAL_ASYNC_VIEWS", "True")
 
 application = get_asgi_application()
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "portal.middleware.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -47,6 +49,15 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Opt-in per-request query counts and timings, reported in a Server-Timing header.
+# A non-zero PORTAL_QUERY_BUDGET logs a warning when a request runs more queries,
+# or raises QueryBudgetExceeded when PORTAL_QUERY_BUDGET_STRICT is set.
+PORTAL_INSTRUMENTATION = config("PORTAL_INSTRUMENTATION", default=False, cast=bool)
+PORTAL_QUERY_BUDGET = config("PORTAL_QUERY_BUDGET", default=0, cast=int)
+PORTAL_QUERY_BUDGET_STRICT = config(
+    "PORTAL_QUERY_BUDGET_STRICT", default=False, cast=bool
+)
+
 ROOT_URLCONF = "pizza_portal.urls"
 
 TEMPLATES = [
@@ -66,19 +77,144 @@ TEMPLATES = [
     },
 ]
 
+if PORTAL_INSTRUMENTATION:
+    MIDDLEWARE.insert(0, "portal.middleware.QueryTimingMiddleware")
+    TEMPLATES[0]["BACKEND"] = "portal.instrumentation.InstrumentedDjangoTemplates"
+
 WSGI_APPLICATION = "pizza_portal.wsgi.application"
 
+# Serve the portal with native async views; asgi.py turns this on by default.
+PORTAL_ASYNC_VIEWS = config("PORTAL_ASYNC_VIEWS", default=False, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
+# DATABASE_PROFILE selects "sqlite" (tuned for several workers sharing one file)
+# or "postgresql" (with Django's native connection pooling).
+
+DATABASE_PROFILE = config("DATABASE_PROFILE", default="sqlite")
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": config("SQLITE_BUSY_TIMEOUT", default=5000, cast=int),
+    "mmap_size": config("SQLITE_MMAP_SIZE", default=134217728, cast=int),
+}
+
+if DATABASE_PROFILE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": config("DATABASE_NAME", default=str(BASE_DIR / "db.sqlite3")),
+            # Under ASGI each request may run in a new thread, and persistent
+            # connections opened there are never closed (Django ticket #33497).
+            "CONN_MAX_AGE": config(
+                "DATABASE_CONN_MAX_AGE",
+                default=0 if PORTAL_ASYNC_VIEWS else 600,
+                cast=int,
+            ),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "init_command": ";".join(
+                    f"PRAGMA {pragma}={value}"
+                    for pragma, value in SQLITE_PRAGMAS.items()
+                ),
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    }
+elif DATABASE_PROFILE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": config("DATABASE_NAME", default="pizza_portal"),
+            "USER": config("DATABASE_USER", default=""),
+            "PASSWORD": config("DATABASE_PASSWORD", default=""),
+            "HOST": config("DATABASE_HOST", default=""),
+            "PORT": config("DATABASE_PORT", default=""),
+            # Pooled connections are returned after each request, so
+            # persistent connections must stay off.
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": config("DATABASE_POOL_MIN_SIZE", default=2, cast=int),
+                    "max_size": config("DATABASE_POOL_MAX_SIZE", default=10, cast=int),
+                    "timeout": config("DATABASE_POOL_TIMEOUT", default=10, cast=int),
+                },
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(
+        f"Unknown DATABASE_PROFILE {DATABASE_PROFILE!r}; use 'sqlite' or 'postgresql'."
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Every worker must see the same menu version, sessions and cached users, so the
+# default is a file cache shared by all processes on the host. Point
+# CACHE_BACKEND at memcached or redis when workers span several hosts. The test
+# settings (pizza_portal/test_settings.py) use per-process memory.
+
+# Set by the test settings.
+TESTING = False
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": config(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=str(BASE_DIR / "cache")),
+        "OPTIONS": {
+            "MAX_ENTRIES": config("CACHE_MAX_ENTRIES", default=10000, cast=int),
+        },
     }
 }
 
+# Per-process caches would let workers keep serving state that another worker
+# already changed, e.g. logged-out sessions, stale employees or topping indexes.
+SHARED_CACHE = CACHES["default"]["BACKEND"] not in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+PORTAL_MENU_CACHE_TIMEOUT = config("PORTAL_MENU_CACHE_TIMEOUT", default=3600, cast=int)
+
+# Each process counts menu cache hits and misses in memory and adds them to the
+# shared totals at most this often, in seconds.
+PORTAL_MENU_STATS_INTERVAL = config("PORTAL_MENU_STATS_INTERVAL", default=60, cast=int)
+
+PORTAL_PAGE_SIZE = config("PORTAL_PAGE_SIZE", default=50, cast=int)
+
+# Most toppings a single autocomplete request returns.
+PORTAL_AUTOCOMPLETE_LIMIT = config("PORTAL_AUTOCOMPLETE_LIMIT", default=20, cast=int)
+
+# Published menu snapshots are written here; the newest PORTAL_SNAPSHOT_KEEP
+# earlier versions are kept for rollback.
+PORTAL_SNAPSHOT_DIR = config("PORTAL_SNAPSHOT_DIR", default=str(BASE_DIR / "snapshots"))
+PORTAL_SNAPSHOT_KEEP = config("PORTAL_SNAPSHOT_KEEP", default=10, cast=int)
+
+# Count the pizzas a topping delete would remove from an in-process bitset
+# index that is reloaded whenever the shared menu version changes, instead of
+# querying the database. Only safe when the version is shared, so it follows SHARED_CACHE.
+PORTAL_TOPPING_INDEX = config("PORTAL_TOPPING_INDEX", default=SHARED_CACHE, cast=bool)
+
+# Where menu change events for the server-sent event stream are published.
+# LocalEventBackend reaches only the current process; use CacheEventBackend
+# with memcached or redis when running several workers.
+PORTAL_EVENTS_BACKEND = config(
+    "PORTAL_EVENTS_BACKEND", default="portal.events.LocalEventBackend"
+)
+PORTAL_EVENTS_POLL_INTERVAL = config(
+    "PORTAL_EVENTS_POLL_INTERVAL", default=1.0, cast=float
+)
+PORTAL_EVENTS_TIMEOUT = config("PORTAL_EVENTS_TIMEOUT", default=300, cast=int)
+PORTAL_EVENTS_KEEPALIVE = config("PORTAL_EVENTS_KEEPALIVE", default=15, cast=int)
+PORTAL_EVENTS_RETRY = config("PORTAL_EVENTS_RETRY", default=5000, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -114,17 +250,52 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
-STATIC_ROOT = ""
+# collectstatic writes content-hashed copies, gzip variants and resized
+# background images (with Pillow installed) to STATIC_ROOT. When it is set,
+# StaticFilesMiddleware serves them with far-future Cache-Control headers.
+STATIC_ROOT = config("STATIC_ROOT", default="")
 STATIC_URL = "static/"
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "portal.storage.PortalStaticFilesStorage",
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Sessions and the logged-in Employee are read from the cache on the hot path
+# when it is shared by every worker (see SHARED_CACHE). Use
+# "django.contrib.sessions.backends.signed_cookies" to skip the session store
+# entirely.
+SESSION_ENGINE = config(
+    "SESSION_ENGINE",
+    default=(
+        "django.contrib.sessions.backends.cached_db"
+        if SHARED_CACHE
+        else "django.contrib.sessions.backends.db"
+    ),
+)
+AUTHENTICATION_BACKENDS = [
+    (
+        "accounts.backends.CachedModelBackend"
+        if SHARED_CACHE
+        else "django.contrib.auth.backends.ModelBackend"
+    )
+]
+ACCOUNTS_USER_CACHE_TIMEOUT = config(
+    "ACCOUNTS_USER_CACHE_TIMEOUT", default=300, cast=int
+)
+
 LOGIN_REDIRECT_URL = "portal"
 LOGOUT_REDIRECT_URL = "home"
 AUTH_USER_MODEL = "accounts.Employee"
@@ -0,0 +1,16 @@
+"""
+Settings for the test suite:
+
+    python manage.py test --settings=pizza_portal.test_settings
+"""
+
+import os
+
+# Set before settings.py reads them, so everything it derives from the cache
+# backend (sessions, the auth backend, the topping index) follows suit.
+os.environ.setdefault("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache")
+os.environ.setdefault("CACHE_LOCATION", "pizza-portal")
+
+from .settings import *  # noqa: E402,F401,F403
+
+TESTING = True
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from django.core.exceptions import ImproperlyConfigured
+from accounts.checks import is_process_local
+from .events import get_event_backend
+
+
+@register()
+def check_event_backend(app_configs, **kwargs):
+    try:
+        get_event_backend()
+    except ImproperlyConfigured as error:
+        return [Error(str(error), obj="PORTAL_EVENTS_BACKEND", id="portal.E001")]
+    return []
+
+
+@register(Tags.caches)
+def check_topping_index(app_configs, **kwargs):
+    # Each worker reloads its index when the menu version moves, which it only
+    # sees if the version lives in a cache every worker shares.
+    if settings.DEBUG or not settings.PORTAL_TOPPING_INDEX:
+        return []
+    if not is_process_local("default"):
+        return []
+    return [
+        Error(
+            "PORTAL_TOPPING_INDEX needs a cache shared by every worker.",
+            hint="Set CACHE_BACKEND to a shared backend, or turn the index off.",
+            obj="PORTAL_TOPPING_INDEX",
+            id="portal.E002",
+        )
+    ]
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import threading
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+from .menu_cache import get_menu_version
+
+SEQUENCE_KEY = "portal:events:sequence"
+# Events a subscriber may fall behind by before older ones are dropped; a
+# client only needs the newest version to know it should refetch.
+QUEUE_SIZE = 100
+
+_backends = {}
+
+
+def _offer(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        pass
+
+
+class LocalEventBackend:
+    """
+    Fan menu events out to the subscribers of this process. Enough for a
+    single worker and for tests.
+    """
+
+    def __init__(self):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def publish(self, event):
+        self.dispatch(event)
+
+    def dispatch(self, event):
+        # Publishers run in sync threads; each queue is only touched from the
+        # event loop that owns it.
+        with self.lock:
+            subscribers = list(self.subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                self.unsubscribe(queue)
+
+    def subscribe(self):
+        queue = asyncio.Queue(QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self.lock:
+            self.subscribers.pop(queue, None)
+
+
+class CacheEventBackend(LocalEventBackend):
+    """
+    Share menu events between workers through the cache. Events are appended
+    under an incrementing sequence number, and one task per worker polls for
+    new ones and fans them out to that worker's subscribers.
+
+    Two workers publishing at once must never get the same sequence number,
+    so only cache backends with a native atomic incr are supported.
+    """
+
+    atomic_incr_backends = {
+        "django.core.cache.backends.memcached.PyMemcacheCache",
+        "django.core.cache.backends.memcached.PyLibMCCache",
+        "django.core.cache.backends.redis.RedisCache",
+    }
+
+    def __init__(self):
+        super().__init__()
+        backend = settings.CACHES["default"]["BACKEND"]
+        if backend not in self.atomic_incr_backends:
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} needs memcached or redis; {backend} "
+                "does not increment atomically across workers."
+            )
+        self.poller = None
+
+    def event_key(self, sequence):
+        return f"portal:events:{sequence}"
+
+    def publish(self, event):
+        try:
+            sequence = cache.incr(SEQUENCE_KEY)
+        except ValueError:
+            cache.add(SEQUENCE_KEY, 0, None)
+            sequence = cache.incr(SEQUENCE_KEY)
+        cache.set(self.event_key(sequence), event, settings.PORTAL_EVENTS_TIMEOUT)
+
+    def subscribe(self):
+        queue = super().subscribe()
+        loop = asyncio.get_running_loop()
+        if (
+            self.poller is None
+            or self.poller.done()
+            or self.poller.get_loop() is not loop
+        ):
+            self.poller = loop.create_task(self.poll())
+        return queue
+
+    async def poll(self):
+        last = await cache.aget(SEQUENCE_KEY, 0)
+        while self.subscribers:
+            await asyncio.sleep(settings.PORTAL_EVENTS_POLL_INTERVAL)
+            sequence = await cache.aget(SEQUENCE_KEY, 0)
+            if sequence <= last:
+                # A flushed cache restarts the sequence.
+                last = min(last, sequence)
+                continue
+            first = max(last + 1, sequence - QUEUE_SIZE + 1)
+            keys = [self.event_key(number) for number in range(first, sequence + 1)]
+            events = await cache.aget_many(keys)
+            for key in keys:
+                if key in events:
+                    self.dispatch(events[key])
+            last = sequence
+
+
+def get_event_backend():
+    path = settings.PORTAL_EVENTS_BACKEND
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def publish_menu_change(changes):
+    event = {"version": get_menu_version(), **changes}
+    get_event_backend().publish(event)
+
+
+def notify_menu_change(pizzas=(), toppings=()):
+    """
+    Publish the menu version and the changed ids once the current
+    transaction commits.
+    """
+    changes = {"pizzas": sorted(set(pizzas)), "toppings": sorted(set(toppings))}
+    transaction.on_commit(lambda: publish_menu_change(changes), robust=True)
+
+
+def format_event(name, data, event_id=None):
+    lines = [f"event: {name}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+async def menu_event_stream(version):
+    """
+    Yield server-sent events: the current version first, then one event per
+    menu change, with a comment line as a keep-alive while the menu is idle.
+    """
+    backend = get_event_backend()
+    queue = backend.subscribe()
+    try:
+        yield f"retry: {settings.PORTAL_EVENTS_RETRY}\n"
+        yield format_event("version", {"version": version}, version)
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), settings.PORTAL_EVENTS_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event("menu", event, event["version"])
+    finally:
+        backend.unsubscribe(queue)
@@ -1,39 +1,36 @@
+from decimal import Decimal
 from django import forms
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Round
+from .events import notify_menu_change
+from .menu_cache import bump_menu_version
 from .models import Pizza, Topping
+from .widgets import ToppingAutocompleteWidget
 
 
 class PizzaForm(forms.ModelForm):
     class Meta:
         model = Pizza
         fields = "__all__"
-        widgets = {"toppings": forms.CheckboxSelectMultiple}
+        widgets = {"toppings": ToppingAutocompleteWidget}
 
     def clean(self):
         data = super(PizzaForm, self).clean()
-        name_data = data.get("name")
         topping_data = data.get("toppings")
 
-        case_insensitive_set = Pizza.objects.filter(name__iexact=name_data).exclude(
-            pk=self.instance.pk
-        )
-        if case_insensitive_set.count() > 0:
-            raise ValidationError("Pizza with this Name already exists.")
-
         if topping_data is None:
             return data
 
-        topping_count = topping_data.count()
-        partial_matches = (
-            Pizza.objects.filter(toppings__in=topping_data)
-            .exclude(pk=self.instance.pk)
-            .distinct()
+        # Always asked of the database: a per-process index can lag behind a
+        # pizza another worker just saved.
+        topping_ids = [topping.pk for topping in topping_data]
+        duplicate_set = Pizza.objects.with_topping_set(topping_ids).exclude(
+            pk=self.instance.pk
         )
-        for match in partial_matches:
-            if match.toppings.count() != topping_count:
-                continue
-            if topping_data.intersection(match.toppings.all()).count() == topping_count:
-                raise ValidationError("Pizza with these Toppings already exists.")
+        if duplicate_set.exists():
+            raise ValidationError("Pizza with these Toppings already exists.")
 
         return data
 
@@ -46,14 +43,82 @@ class ToppingForm(forms.ModelForm):
             "additional_cost",
         ]
 
-    def clean(self):
-        data = super(ToppingForm, self).clean()
-        name_data = data.get("name")
-        case_insensitive_set = Topping.objects.filter(name__iexact=name_data).exclude(
-            pk=self.instance.pk
-        )
 
-        if len(case_insensitive_set) > 0:
-            raise ValidationError("Topping with this Name already exists.")
+class BulkActionForm(forms.Form):
+    ACTIONS = [
+        ("set_cost", "Set cost to"),
+        ("adjust_percent", "Adjust cost by %"),
+        ("delete", "Delete"),
+    ]
 
+    items = forms.ModelMultipleChoiceField(queryset=Topping.objects.none())
+    action = forms.ChoiceField(choices=ACTIONS)
+    amount = forms.DecimalField(required=False, max_digits=8, decimal_places=2)
+
+    def __init__(self, acct_type, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model = Topping if acct_type == "owner" else Pizza
+        self.cost_field = "additional_cost" if self.model is Topping else "cost"
+        self.fields["items"].queryset = self.model.objects.all()
+
+    def clean(self):
+        data = super().clean()
+        action, amount = data.get("action"), data.get("amount")
+        if action in ("set_cost", "adjust_percent") and amount is None:
+            self.add_error("amount", "This action needs an amount.")
+        elif action == "set_cost" and amount < 0:
+            self.add_error("amount", "Cost cannot be negative.")
+        elif action == "adjust_percent" and amount <= -100:
+            self.add_error("amount", "Cost cannot drop by 100% or more.")
         return data
+
+    def save(self):
+        items = self.cleaned_data["items"]
+        action = self.cleaned_data["action"]
+        amount = self.cleaned_data["amount"]
+
+        # Set-based statements only: the query count doesn't grow with the
+        # number of selected items, and no per-row signals are sent, so the
+        # menu version is bumped once by hand.
+        item_ids = [item.pk for item in items]
+        with transaction.atomic():
+            # Read before any delete, so the change event lists the pizzas too.
+            pizza_ids = (
+                list(
+                    Pizza.toppings.through.objects.filter(
+                        topping__in=items
+                    ).values_list("pizza_id", flat=True)
+                )
+                if self.model is Topping
+                else item_ids
+            )
+            if action == "delete":
+                count = self.delete(items)
+            else:
+                if action == "set_cost":
+                    cost = amount
+                else:
+                    factor = 1 + amount / Decimal(100)
+                    cost = Round(F(self.cost_field) * factor, 2)
+                count = items.update(**{self.cost_field: cost})
+                pizzas = (
+                    Pizza.objects.filter(toppings__in=items)
+                    if self.model is Topping
+                    else items
+                )
+                pizzas.refresh_total_costs()
+            bump_menu_version()
+            if self.model is Topping:
+                notify_menu_change(pizzas=pizza_ids, toppings=item_ids)
+            else:
+                notify_menu_change(pizzas=pizza_ids)
+        return count
+
+    def delete(self, items):
+        through = Pizza.toppings.through
+        if self.model is Topping:
+            items.delete_dependent_pizzas()
+            through.objects.filter(topping__in=items).delete()
+        else:
+            through.objects.filter(pizza__in=items).delete()
+        return items._raw_delete(items.db)
@@ -0,0 +1,79 @@
+import functools
+import time
+from contextvars import ContextVar
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+current_timings = ContextVar("portal_request_timings", default=None)
+
+
+class RequestTimings:
+    __slots__ = (
+        "queries",
+        "db_seconds",
+        "template_seconds",
+        "context_processor_seconds",
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.context_processor_seconds = 0.0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+
+def timed_context_processor(processor):
+    @functools.wraps(processor)
+    def wrapper(request):
+        timings = current_timings.get()
+        if timings is None:
+            return processor(request)
+
+        started = time.perf_counter()
+        try:
+            return processor(request)
+        finally:
+            timings.context_processor_seconds += time.perf_counter() - started
+
+    return wrapper
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        timings = current_timings.get()
+        if timings is None:
+            return super().render(context, request)
+
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_seconds += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(django_backend.DjangoTemplates):
+    """Django template backend that reports render time to QueryTimingMiddleware."""
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.engine.template_context_processors = tuple(
+            timed_context_processor(processor)
+            for processor in self.engine.template_context_processors
+        )
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
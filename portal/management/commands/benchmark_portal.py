@@ -0,0 +1,251 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from portal.forms import PizzaForm
+from portal.menu_cache import bump_menu_version
+from portal.models import CENTS, Pizza, Topping, topping_fingerprint
+
+STATUS_OK = 200
+MAX_TOPPINGS_PER_PIZZA = 5
+
+
+def parse_sizes(value):
+    try:
+        sizes = [int(size) for size in value.split(",")]
+    except ValueError:
+        raise CommandError(f"Expected comma-separated integers, got {value!r}.")
+    if any(size < 1 for size in sizes):
+        raise CommandError("Sizes must be positive.")
+    return sizes
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed deterministic synthetic menus and measure portal hot paths. "
+        "Each result is printed as one JSON object per line. The menus are seeded "
+        "into a throwaway database, which is dropped afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pizzas",
+            default="100,1000",
+            help="Comma-separated menu sizes to benchmark (default 100,1000).",
+        )
+        parser.add_argument(
+            "--toppings",
+            default="50,200",
+            help="Comma-separated topping counts, one per menu size (default 50,200).",
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--label", default="", help="Free-form label, e.g. a commit hash."
+        )
+        parser.add_argument("--output", help="Append results to this file.")
+
+    def handle(self, *args, **options):
+        pizza_sizes = parse_sizes(options["pizzas"])
+        topping_sizes = parse_sizes(options["toppings"])
+        if len(pizza_sizes) != len(topping_sizes):
+            raise CommandError("--pizzas and --toppings need the same number of sizes.")
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be positive.")
+
+        # Private cache keys, so live workers never see benchmark pages.
+        cache_settings = {**settings.CACHES["default"], "KEY_PREFIX": "benchmark"}
+        with self.scratch_database(), override_settings(
+            CACHES={"default": cache_settings}
+        ):
+            results = self.run_benchmarks(options, pizza_sizes, topping_sizes)
+
+        if options["output"]:
+            with open(options["output"], "a", encoding="utf-8") as output:
+                for result in results:
+                    output.write(json.dumps(result, sort_keys=True) + "\n")
+
+    @contextmanager
+    def scratch_database(self):
+        """
+        Run against a freshly migrated throwaway database, so the live one is
+        neither locked nor mixed into the seeded menus.
+        """
+        if settings.TESTING:
+            # The test runner already provides one.
+            yield
+            return
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run_benchmarks(self, options, pizza_sizes, topping_sizes):
+        results = []
+        for pizza_count, topping_count in zip(pizza_sizes, topping_sizes):
+            with transaction.atomic():
+                rng = random.Random(options["seed"])
+                self.seed_menu(rng, pizza_count, topping_count)
+                for scenario, run in self.scenarios(rng):
+                    result = self.measure(run, options["iterations"])
+                    result.update(
+                        {
+                            "label": options["label"],
+                            "scenario": scenario,
+                            "pizzas": pizza_count,
+                            "toppings": topping_count,
+                        }
+                    )
+                    results.append(result)
+                    self.stdout.write(json.dumps(result, sort_keys=True))
+                transaction.set_rollback(True)
+            bump_menu_version()
+        return results
+
+    def seed_menu(self, rng, pizza_count, topping_count):
+        toppings = Topping.objects.bulk_create(
+            Topping(
+                name=f"Benchmark Topping {index:05d}",
+                additional_cost=rng.choice(["0.00", "0.25", "0.50", "1.00", "1.99"]),
+            )
+            for index in range(topping_count)
+        )
+        topping_ids = [topping.pk for topping in toppings]
+        topping_costs = {
+            topping.pk: Decimal(topping.additional_cost) for topping in toppings
+        }
+        combinations = set()
+        pizzas, links = [], []
+        # Cap attempts so a tiny topping catalogue cannot loop forever.
+        for attempt in range(pizza_count * 20):
+            if len(pizzas) == pizza_count:
+                break
+            size = rng.randint(1, min(MAX_TOPPINGS_PER_PIZZA, len(topping_ids)))
+            combination = frozenset(rng.sample(topping_ids, size))
+            if combination in combinations:
+                continue
+            combinations.add(combination)
+            cost = Decimal(rng.randint(600, 2400)) / 100
+            pizzas.append(
+                Pizza(
+                    name=f"Benchmark Pizza {len(pizzas):06d}",
+                    description="Synthetic benchmark pizza.",
+                    cost=cost,
+                    topping_fingerprint=topping_fingerprint(combination),
+                    total_cost=(
+                        cost + sum(topping_costs[pk] for pk in combination)
+                    ).quantize(CENTS),
+                )
+            )
+            links.append(combination)
+        Pizza.objects.bulk_create(pizzas)
+        Pizza.toppings.through.objects.bulk_create(
+            Pizza.toppings.through(pizza_id=pizza.pk, topping_id=topping_id)
+            for pizza, combination in zip(pizzas, links)
+            for topping_id in combination
+        )
+        bump_menu_version()
+
+        self.pizzas = pizzas
+        self.combinations = links
+        self.toppings = toppings
+        self.chef = self.create_user("benchmark_chef", "chef")
+        self.owner = self.create_user("benchmark_owner", "owner")
+
+    def create_user(self, username, account_type):
+        user = get_user_model()(username=username, account_type=account_type)
+        user.set_unusable_password()
+        user.save()
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def scenarios(self, rng):
+        portal_url = reverse("portal")
+
+        def get(client, url):
+            response = client.get(url)
+            if response.status_code != STATUS_OK:
+                raise CommandError(f"GET {url} returned {response.status_code}.")
+
+        def portal_view_cold():
+            bump_menu_version()
+            get(self.chef, portal_url)
+
+        def portal_view_warm():
+            get(self.chef, portal_url)
+
+        def edit_view():
+            pizza = rng.choice(self.pizzas)
+            get(self.chef, reverse("edit", kwargs={"item_id": pizza.pk}))
+
+        def pizza_form_clean():
+            form = PizzaForm(
+                {
+                    "name": "Benchmark Candidate",
+                    "cost": "9.99",
+                    "toppings": list(rng.choice(self.combinations)),
+                }
+            )
+            form.is_valid()
+
+        def topping_delete():
+            with transaction.atomic():
+                # Model.delete() clears the pk, so delete a fresh instance.
+                Topping(pk=rng.choice(self.toppings).pk).delete()
+                transaction.set_rollback(True)
+
+        return [
+            ("portal_view_cold", portal_view_cold),
+            ("portal_view_warm", portal_view_warm),
+            ("edit_view", edit_view),
+            ("pizza_form_clean", pizza_form_clean),
+            ("topping_delete", topping_delete),
+        ]
+
+    def measure(self, run, iterations):
+        run()
+        latencies, query_counts = [], []
+        for iteration in range(iterations):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                run()
+                latencies.append((time.perf_counter() - started) * 1000)
+            query_counts.append(len(queries))
+
+        # Memory is sampled in a separate pass so tracing does not skew timings.
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "iterations": iterations,
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "p50_ms": round(percentile(latencies, 0.50), 3),
+            "p90_ms": round(percentile(latencies, 0.90), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "queries": max(query_counts),
+            "peak_memory_kib": round(peak / 1024, 1),
+        }
@@ -0,0 +1,65 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+
+SQLITE_PRAGMAS = [
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "mmap_size",
+    "foreign_keys",
+    "cache_size",
+]
+SYNCHRONOUS_MODES = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+
+
+class Command(BaseCommand):
+    help = "Check database connectivity and print the effective tuning settings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        self.stdout.write(f"profile: {settings.DATABASE_PROFILE}")
+        self.stdout.write(f"vendor: {connection.vendor}")
+        self.stdout.write(f"conn_max_age: {connection.settings_dict['CONN_MAX_AGE']}")
+
+        started = time.perf_counter()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        except DatabaseError as error:
+            raise CommandError(f"Database check failed: {error}")
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"round trip: {elapsed:.2f}ms")
+
+        if connection.vendor == "sqlite":
+            self.sqlite_diagnostics(connection)
+        elif connection.vendor == "postgresql":
+            self.postgresql_diagnostics(connection)
+
+    def sqlite_diagnostics(self, connection):
+        self.stdout.write(
+            f"transaction_mode: {connection.transaction_mode or 'DEFERRED'}"
+        )
+        with connection.cursor() as cursor:
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(f"PRAGMA {pragma}")
+                row = cursor.fetchone()
+                # Some pragmas, such as mmap_size, return nothing in memory.
+                value = row[0] if row else "n/a"
+                if pragma == "synchronous":
+                    value = SYNCHRONOUS_MODES.get(value, value)
+                self.stdout.write(f"{pragma}: {value}")
+
+    def postgresql_diagnostics(self, connection):
+        self.stdout.write(f"server_version: {connection.pg_version}")
+        pool = connection.pool
+        if pool is None:
+            self.stdout.write("pool: disabled")
+            return
+        for name, value in sorted(pool.get_stats().items()):
+            self.stdout.write(f"pool {name}: {value}")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from portal.menu_export import EXPORT_FORMATS, export_menu
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream every topping and pizza, with costs and totals, as CSV or JSONL. "
+        "The output can be loaded again with import_menu."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+        parser.add_argument(
+            "--output", help="File to write. Defaults to standard output."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched from the database at a time (default 2000).",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        chunks = export_menu(options["format"], options["chunk_size"])
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        try:
+            with open(options["output"], "w", newline="", encoding="utf-8") as output:
+                output.writelines(chunks)
+        except OSError as error:
+            raise CommandError(f"Unable to write {options['output']}: {error.strerror}")
@@ -0,0 +1,68 @@
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from portal.menu_import import MenuImporter, read_csv_rows, read_jsonl_rows
+
+READERS = {
+    "csv": read_csv_rows,
+    "jsonl": read_jsonl_rows,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import toppings and pizzas from a CSV or JSONL file. Each row has a type "
+        "('topping' or 'pizza'), name, cost, and for pizzas an optional "
+        "description and the names of existing or earlier-imported toppings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or '-' for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows validated and written per transaction (default 1000).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"] or path.rsplit(".", 1)[-1].lower()
+        if input_format not in READERS:
+            raise CommandError("Unable to infer the format; pass --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        started = time.perf_counter()
+        if path == "-":
+            importer = self.import_stream(sys.stdin, input_format, options)
+        else:
+            try:
+                with open(path, newline="", encoding="utf-8") as stream:
+                    importer = self.import_stream(stream, input_format, options)
+            except OSError as error:
+                raise CommandError(f"Unable to read {path}: {error.strerror}")
+        elapsed = time.perf_counter() - started
+
+        rate = importer.rows / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f"Imported {importer.toppings_created} toppings and "
+            f"{importer.pizzas_created} pizzas from {importer.rows} rows "
+            f"({importer.error_count} errors) in {elapsed:.2f}s, {rate:.0f} rows/s."
+        )
+
+    def import_stream(self, stream, input_format, options):
+        rows = READERS[input_format](stream)
+        importer = MenuImporter(
+            batch_size=options["batch_size"], report_errors=self.write_errors
+        )
+        return importer.run(rows)
+
+    def write_errors(self, errors):
+        for line_number, message in errors:
+            self.stderr.write(f"line {line_number}: {message}")
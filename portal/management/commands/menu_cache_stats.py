@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from portal.menu_cache import menu_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Print the shared menu cache version and hit/miss counters."
+
+    def handle(self, *args, **options):
+        stats = menu_cache_stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups if lookups else 0.0
+        self.stdout.write(f"version: {stats['version']}")
+        self.stdout.write(f"hits: {stats['hits']}")
+        self.stdout.write(f"misses: {stats['misses']}")
+        self.stdout.write(f"hit rate: {hit_rate:.1%}")
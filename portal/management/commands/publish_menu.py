@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from portal.models import MenuSnapshot
+from portal.snapshots import SnapshotError, publish_menu, rollback_menu
+
+
+class Command(BaseCommand):
+    help = "Publish the menu as a precomputed snapshot, or roll back to an earlier one."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=None,
+            help="Earlier snapshots to keep for rollback (default PORTAL_SNAPSHOT_KEEP).",
+        )
+        parser.add_argument(
+            "--rollback",
+            nargs="?",
+            type=int,
+            const=0,
+            default=None,
+            metavar="VERSION",
+            help="Make VERSION, or the snapshot before the current one, current again.",
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="List the stored snapshots."
+        )
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for snapshot in MenuSnapshot.objects.only(
+                "version", "published_at", "checksum", "is_current"
+            ):
+                marker = "*" if snapshot.is_current else " "
+                self.stdout.write(
+                    f"{marker} {snapshot.version}\t"
+                    f"{snapshot.published_at:%Y-%m-%d %H:%M:%S}\t"
+                    f"{snapshot.checksum[:12]}"
+                )
+            return
+
+        if options["rollback"] is not None:
+            try:
+                snapshot = rollback_menu(options["rollback"] or None)
+            except SnapshotError as error:
+                raise CommandError(error)
+            self.stdout.write(f"Rolled back to menu snapshot {snapshot.version}.")
+            return
+
+        snapshot = publish_menu(keep=options["keep"])
+        self.stdout.write(
+            f"Published menu snapshot {snapshot.version} "
+            f"({len(snapshot.document)} bytes)."
+        )
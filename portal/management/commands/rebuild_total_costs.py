@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from portal.menu_cache import bump_menu_version
+from portal.models import Pizza
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored Pizza.total_cost column and check it for drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report pizzas whose stored total differs; change nothing.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["verify"]:
+            with transaction.atomic():
+                updated = Pizza.objects.refresh_total_costs()
+                bump_menu_version()
+            self.stdout.write(f"Rebuilt total_cost for {updated} pizza(s).")
+
+        stale = (
+            Pizza.objects.with_total_cost()
+            .exclude(total_cost=F("total"))
+            .order_by("pk")
+        )
+        mismatches = [
+            f"{pizza.name}: stored {pizza.total_cost}, expected {pizza.total}"
+            for pizza in stale
+        ]
+        for mismatch in mismatches:
+            self.stderr.write(mismatch)
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} pizza(s) have a stale total_cost.")
+        self.stdout.write("All stored totals match.")
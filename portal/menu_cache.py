@@ -0,0 +1,226 @@
+import hashlib
+import threading
+import time
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from .models import Pizza, Topping
+from .pagination import akeyset_page, keyset_page
+from .search import search_page
+from .serializers import serialize_menu
+
+VERSION_KEY = "portal:menu:version"
+HITS_KEY = "portal:menu:hits"
+MISSES_KEY = "portal:menu:misses"
+
+# Hits and misses of this process, added to the shared totals at most every
+# PORTAL_MENU_STATS_INTERVAL seconds so a warm hit never writes to the cache.
+_counts = {HITS_KEY: 0, MISSES_KEY: 0}
+_counts_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def get_menu_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a flushed cache never reuses an old version.
+        cache.add(VERSION_KEY, time.time_ns() // 1000, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def aget_menu_version():
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time_ns() // 1000, None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def _increment_menu_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        get_menu_version()
+
+
+def bump_menu_version():
+    # Bump now for readers inside this transaction, and again on commit so a
+    # reader that cached pre-commit rows under the new version is discarded.
+    _increment_menu_version()
+    transaction.on_commit(_increment_menu_version)
+
+
+def _take_counts(force):
+    global _flushed_at
+    now = time.monotonic()
+    if not force and now - _flushed_at < settings.PORTAL_MENU_STATS_INTERVAL:
+        return {}
+    counts = {key: count for key, count in _counts.items() if count}
+    _counts.update(dict.fromkeys(_counts, 0))
+    _flushed_at = now
+    return counts
+
+
+def _add_counts(counts):
+    for key, count in counts.items():
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            if not cache.add(key, count, None):
+                cache.incr(key, count)
+
+
+async def _aadd_counts(counts):
+    for key, count in counts.items():
+        try:
+            await cache.aincr(key, count)
+        except ValueError:
+            if not await cache.aadd(key, count, None):
+                await cache.aincr(key, count)
+
+
+def _count(key):
+    with _counts_lock:
+        _counts[key] += 1
+        counts = _take_counts(force=False)
+    _add_counts(counts)
+
+
+async def _acount(key):
+    with _counts_lock:
+        _counts[key] += 1
+        counts = _take_counts(force=False)
+    await _aadd_counts(counts)
+
+
+def flush_menu_cache_stats():
+    """Add this process's pending hit and miss counts to the shared totals."""
+    with _counts_lock:
+        counts = _take_counts(force=True)
+    _add_counts(counts)
+
+
+def _menu_queryset(acct_type):
+    if acct_type == "owner":
+        return Topping.objects.all()
+    return Pizza.objects.all()
+
+
+def _load_menu_page(acct_type, query, after, page_size):
+    if acct_type != "owner" and query:
+        # Pizza searches are full-text and ranked, and page by offset.
+        return search_page(query, after, page_size)
+    return keyset_page(_menu_queryset(acct_type), query, after, page_size)
+
+
+async def _aload_menu_page(acct_type, query, after, page_size):
+    if acct_type != "owner" and query:
+        return await sync_to_async(search_page)(query, after, page_size)
+    return await akeyset_page(_menu_queryset(acct_type), query, after, page_size)
+
+
+def _menu_page_key(version, acct_type, query, after, page_size):
+    params = urlencode({"q": query, "after": after, "size": page_size})
+    params_hash = hashlib.md5(params.encode()).hexdigest()
+    return f"portal:menu:{version}:{acct_type}:{params_hash}"
+
+
+def get_menu_page(acct_type, query="", after="", page_size=None):
+    page_size = page_size or settings.PORTAL_PAGE_SIZE
+    key = _menu_page_key(get_menu_version(), acct_type, query, after, page_size)
+    page = cache.get(key)
+    if page is not None:
+        _count(HITS_KEY)
+        return page
+
+    _count(MISSES_KEY)
+    page = _load_menu_page(acct_type, query, after, page_size)
+    cache.set(key, page, settings.PORTAL_MENU_CACHE_TIMEOUT)
+    return page
+
+
+async def aget_menu_page(acct_type, query="", after="", page_size=None):
+    page_size = page_size or settings.PORTAL_PAGE_SIZE
+    version = await aget_menu_version()
+    key = _menu_page_key(version, acct_type, query, after, page_size)
+    page = await cache.aget(key)
+    if page is not None:
+        await _acount(HITS_KEY)
+        return page
+
+    await _acount(MISSES_KEY)
+    page = await _aload_menu_page(acct_type, query, after, page_size)
+    await cache.aset(key, page, settings.PORTAL_MENU_CACHE_TIMEOUT)
+    return page
+
+
+def render_menu_grid(acct_type, query, after, page):
+    items, next_cursor = page
+    return render_to_string(
+        "portal_grid.html",
+        {
+            "role": acct_type,
+            "items": items,
+            "query": query,
+            "after": after,
+            "next_cursor": next_cursor,
+        },
+    )
+
+
+def get_menu_grid(acct_type, query="", after="", page_size=None):
+    page_size = page_size or settings.PORTAL_PAGE_SIZE
+    version = get_menu_version()
+    key = _menu_page_key(version, acct_type, query, after, page_size) + ":grid"
+    grid = cache.get(key)
+    if grid is not None:
+        _count(HITS_KEY)
+        return mark_safe(grid)
+
+    page = get_menu_page(acct_type, query, after, page_size)
+    grid = render_menu_grid(acct_type, query, after, page)
+    cache.set(key, grid, settings.PORTAL_MENU_CACHE_TIMEOUT)
+    return grid
+
+
+async def aget_menu_grid(acct_type, query="", after="", page_size=None):
+    page_size = page_size or settings.PORTAL_PAGE_SIZE
+    version = await aget_menu_version()
+    key = _menu_page_key(version, acct_type, query, after, page_size) + ":grid"
+    grid = await cache.aget(key)
+    if grid is not None:
+        await _acount(HITS_KEY)
+        return mark_safe(grid)
+
+    page = await aget_menu_page(acct_type, query, after, page_size)
+    grid = render_menu_grid(acct_type, query, after, page)
+    await cache.aset(key, grid, settings.PORTAL_MENU_CACHE_TIMEOUT)
+    return grid
+
+
+def get_menu_document():
+    version = get_menu_version()
+    key = f"portal:menu:{version}:document"
+    document = cache.get(key)
+    if document is not None:
+        _count(HITS_KEY)
+        return document
+
+    _count(MISSES_KEY)
+    document = {"version": version, **serialize_menu()}
+    cache.set(key, document, settings.PORTAL_MENU_CACHE_TIMEOUT)
+    return document
+
+
+def menu_cache_stats():
+    flush_menu_cache_stats()
+    return {
+        "version": get_menu_version(),
+        "hits": cache.get(HITS_KEY, 0),
+        "misses": cache.get(MISSES_KEY, 0),
+    }
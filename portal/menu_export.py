@@ -0,0 +1,78 @@
+import csv
+import json
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from .menu_import import TOPPING_SEPARATOR
+from .models import Pizza, Topping
+
+EXPORT_FIELDS = ["type", "name", "description", "cost", "toppings", "total_cost"]
+
+
+def iter_menu_rows(chunk_size=2000):
+    for topping in Topping.objects.order_by("pk").iterator(chunk_size=chunk_size):
+        yield {
+            "type": "topping",
+            "name": topping.name,
+            "description": "",
+            "cost": str(topping.additional_cost),
+            "toppings": [],
+            "total_cost": "",
+        }
+
+    pizzas = Pizza.objects.prefetch_related(
+        Prefetch("toppings", queryset=Topping.objects.only("name"))
+    ).order_by("pk")
+    for pizza in pizzas.iterator(chunk_size=chunk_size):
+        yield {
+            "type": "pizza",
+            "name": pizza.name,
+            "description": pizza.description,
+            "cost": str(pizza.cost),
+            "toppings": [topping.name for topping in pizza.toppings.all()],
+            "total_cost": str(pizza.total_cost),
+        }
+
+
+class EchoBuffer:
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row["toppings"] = TOPPING_SEPARATOR.join(row["toppings"])
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, separators=(",", ":")) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv"),
+    "jsonl": (iter_jsonl, "application/jsonl"),
+}
+
+
+def export_menu(export_format, chunk_size=2000):
+    serialize, _ = EXPORT_FORMATS[export_format]
+    return serialize(iter_menu_rows(chunk_size))
+
+
+def _next_lines(lines, count):
+    return "".join(islice(lines, count))
+
+
+async def aexport_menu(export_format, chunk_size=2000):
+    """
+    Yield the export to an async view, fetching ``chunk_size`` lines per trip
+    to the sync thread so the whole menu is never held in memory.
+    """
+    lines = export_menu(export_format, chunk_size)
+    next_lines = sync_to_async(_next_lines)
+    while chunk := await next_lines(lines, chunk_size):
+        yield chunk
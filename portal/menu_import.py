@@ -0,0 +1,217 @@
+import csv
+import json
+from decimal import Decimal
+from itertools import islice
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+from .events import notify_menu_change
+from .menu_cache import bump_menu_version
+from .models import CENTS, Pizza, Topping, topping_fingerprint
+
+TOPPING_SEPARATOR = ";"
+
+
+class RowError(Exception):
+    pass
+
+
+def read_csv_rows(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        toppings = row.get("toppings") or ""
+        row["toppings"] = [
+            name.strip() for name in toppings.split(TOPPING_SEPARATOR) if name.strip()
+        ]
+        yield reader.line_num, row
+
+
+def read_jsonl_rows(stream):
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield line_number, RowError(f"invalid JSON: {error.msg}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, RowError("expected a JSON object")
+            continue
+        yield line_number, row
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def clean_field(model, field_name, value):
+    try:
+        return model._meta.get_field(field_name).clean(value, None)
+    except ValidationError as error:
+        raise RowError(f"{field_name}: {' '.join(error.messages)}")
+
+
+class MenuImporter:
+    """
+    Import rows in batches. The (line number, message) errors of each batch
+    are handed to ``report_errors`` once it is done, so only their count is
+    kept however large the file.
+    """
+
+    def __init__(self, batch_size=1000, report_errors=None):
+        self.batch_size = batch_size
+        self.report_errors = report_errors
+        self.rows = 0
+        self.toppings_created = 0
+        self.pizzas_created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, rows):
+        for batch in batched(rows, self.batch_size):
+            self.import_batch(batch)
+        if self.toppings_created or self.pizzas_created:
+            bump_menu_version()
+        return self
+
+    def import_batch(self, batch):
+        self.rows += len(batch)
+        toppings, pizzas = [], []
+        for line_number, row in batch:
+            if isinstance(row, RowError):
+                self.errors.append((line_number, str(row)))
+                continue
+            row_type = str(row.get("type", "")).strip().lower()
+            if row_type == "topping":
+                toppings.append((line_number, row))
+            elif row_type == "pizza":
+                pizzas.append((line_number, row))
+            else:
+                self.errors.append((line_number, f"unknown row type {row_type!r}"))
+
+        with transaction.atomic():
+            new_toppings = self.build_toppings(toppings)
+            Topping.objects.bulk_create(new_toppings)
+            new_pizzas, topping_ids = self.build_pizzas(pizzas)
+            Pizza.objects.bulk_create(new_pizzas)
+            Pizza.toppings.through.objects.bulk_create(
+                Pizza.toppings.through(pizza_id=pizza.pk, topping_id=topping_id)
+                for pizza, ids in zip(new_pizzas, topping_ids)
+                for topping_id in ids
+            )
+            notify_menu_change(
+                pizzas=[pizza.pk for pizza in new_pizzas],
+                toppings=[topping.pk for topping in new_toppings],
+            )
+        self.toppings_created += len(new_toppings)
+        self.pizzas_created += len(new_pizzas)
+        self.error_count += len(self.errors)
+        if self.report_errors is not None:
+            self.report_errors(sorted(self.errors))
+        self.errors = []
+
+    def existing_names(self, model, names):
+        return set(
+            model.objects.annotate(lower_name=Lower("name"))
+            .filter(lower_name__in=names)
+            .values_list("lower_name", flat=True)
+        )
+
+    def build_toppings(self, rows):
+        candidates = []
+        for line_number, row in rows:
+            try:
+                name = clean_field(Topping, "name", row.get("name"))
+                cost = row.get("additional_cost", row.get("cost")) or Decimal("0.00")
+                cost = clean_field(Topping, "additional_cost", cost)
+            except RowError as error:
+                self.errors.append((line_number, str(error)))
+                continue
+            candidates.append((line_number, Topping(name=name, additional_cost=cost)))
+
+        taken = self.existing_names(
+            Topping, [topping.name.lower() for _, topping in candidates]
+        )
+        toppings = []
+        for line_number, topping in candidates:
+            if topping.name.lower() in taken:
+                self.errors.append(
+                    (line_number, "Topping with this Name already exists.")
+                )
+                continue
+            taken.add(topping.name.lower())
+            toppings.append(topping)
+        return toppings
+
+    def build_pizzas(self, rows):
+        candidates = []
+        for line_number, row in rows:
+            try:
+                name = clean_field(Pizza, "name", row.get("name"))
+                cost = clean_field(Pizza, "cost", row.get("cost"))
+                description = clean_field(
+                    Pizza, "description", row.get("description") or ""
+                )
+                topping_names = row.get("toppings") or []
+                if isinstance(topping_names, str) or not topping_names:
+                    raise RowError("toppings: expected a non-empty list of names.")
+            except RowError as error:
+                self.errors.append((line_number, str(error)))
+                continue
+            pizza = Pizza(name=name, cost=cost, description=description)
+            lowered = {str(topping).strip().lower() for topping in topping_names}
+            candidates.append((line_number, pizza, lowered))
+
+        requested = {name for _, _, names in candidates for name in names}
+        topping_lookup = {
+            lower_name: (pk, additional_cost)
+            for lower_name, pk, additional_cost in Topping.objects.annotate(
+                lower_name=Lower("name")
+            )
+            .filter(lower_name__in=requested)
+            .values_list("lower_name", "pk", "additional_cost")
+        }
+        resolved = []
+        for line_number, pizza, names in candidates:
+            missing = sorted(names - topping_lookup.keys())
+            if missing:
+                self.errors.append(
+                    (line_number, f"unknown toppings: {', '.join(missing)}")
+                )
+                continue
+            ids = sorted(topping_lookup[name][0] for name in names)
+            topping_costs = sum(topping_lookup[name][1] for name in names)
+            pizza.topping_fingerprint = topping_fingerprint(ids)
+            pizza.total_cost = (pizza.cost + topping_costs).quantize(CENTS)
+            resolved.append((line_number, pizza, ids))
+
+        taken_names = self.existing_names(
+            Pizza, [pizza.name.lower() for _, pizza, _ in resolved]
+        )
+        taken_sets = set(
+            Pizza.objects.filter(
+                topping_fingerprint__in=[
+                    pizza.topping_fingerprint for _, pizza, _ in resolved
+                ]
+            ).values_list("topping_fingerprint", flat=True)
+        )
+        pizzas, topping_ids = [], []
+        for line_number, pizza, ids in resolved:
+            if pizza.name.lower() in taken_names:
+                self.errors.append(
+                    (line_number, "Pizza with this Name already exists.")
+                )
+                continue
+            if pizza.topping_fingerprint in taken_sets:
+                self.errors.append(
+                    (line_number, "Pizza with these Toppings already exists.")
+                )
+                continue
+            taken_names.add(pizza.name.lower())
+            taken_sets.add(pizza.topping_fingerprint)
+            pizzas.append(pizza)
+            topping_ids.append(ids)
+        return pizzas, topping_ids
@@ -0,0 +1,176 @@
+import logging
+import mimetypes
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from .instrumentation import RequestTimings, current_timings
+
+logger = logging.getLogger("portal.instrumentation")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryTimingMiddleware:
+    """
+    Count queries and database time per request, time template rendering
+    separately from the rest of the view, and report both in a Server-Timing
+    header and a structured log line.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = timings.db_seconds * 1000
+        template_ms = timings.template_seconds * 1000
+        # Context processors run inside the template render.
+        context_ms = timings.context_processor_seconds * 1000
+        view_ms = total_ms - template_ms
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={db_ms:.2f};desc="{timings.queries} queries"',
+                f'tpl;dur={template_ms - context_ms:.2f};desc="Template render"',
+                f'ctx;dur={context_ms:.2f};desc="Context processors"',
+                f'view;dur={view_ms:.2f};desc="View excluding templates"',
+                f"total;dur={total_ms:.2f}",
+            ]
+        )
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": timings.queries,
+            "db_ms": round(db_ms, 2),
+            "template_ms": round(template_ms - context_ms, 2),
+            "context_processor_ms": round(context_ms, 2),
+            "view_ms": round(view_ms, 2),
+            "total_ms": round(total_ms, 2),
+        }
+        logger.info(
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"timing": fields},
+        )
+        self.check_query_budget(request, timings.queries)
+        return response
+
+    def check_query_budget(self, request, queries):
+        budget = settings.PORTAL_QUERY_BUDGET
+        if not budget or queries <= budget:
+            return
+
+        message = (
+            f"{request.method} {request.path} ran {queries} queries (budget {budget})."
+        )
+        if settings.PORTAL_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected files from STATIC_ROOT. Content-hashed names from the
+    staticfiles manifest are cached by clients for a year without
+    revalidation, and gzip copies written by collectstatic are sent to
+    clients that accept them.
+    """
+
+    immutable_max_age = 60 * 60 * 24 * 365
+    max_age = 60 * 60
+    # Async-capable, so async views (and their long-lived event streams) don't
+    # fall back to a thread per request when STATIC_ROOT is set.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.root = Path(settings.STATIC_ROOT)
+        self.prefix = settings.STATIC_URL
+        self.hashed_names = set(
+            getattr(staticfiles_storage, "hashed_files", {}).values()
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.serve_static(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        response = self.serve_static(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def serve_static(self, request):
+        if request.method in ("GET", "HEAD") and request.path.startswith(self.prefix):
+            return self.serve(request, request.path.removeprefix(self.prefix))
+        return None
+
+    def serve(self, request, name):
+        try:
+            path = Path(safe_join(self.root, name))
+        except SuspiciousFileOperation:
+            return None
+        if not path.is_file():
+            return None
+
+        content_type, _ = mimetypes.guess_type(path.name)
+        compressed = path.with_name(f"{path.name}.gz")
+        accepts_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+        served = compressed if accepts_gzip and compressed.is_file() else path
+
+        stat = served.stat()
+        if not was_modified_since(
+            request.headers.get("If-Modified-Since"), stat.st_mtime
+        ):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(
+                served.open("rb"),
+                filename=path.name,
+                content_type=content_type or "application/octet-stream",
+            )
+            response["Content-Length"] = stat.st_size
+            if served is compressed:
+                response["Content-Encoding"] = "gzip"
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        if compressed.is_file():
+            response["Vary"] = "Accept-Encoding"
+        if name in self.hashed_names:
+            response["Cache-Control"] = (
+                f"public, max-age={self.immutable_max_age}, immutable"
+            )
+        else:
+            response["Cache-Control"] = f"public, max-age={self.max_age}"
+        return response
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-17 09:12
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def topping_fingerprint(topping_ids):
+    # A frozen copy of portal.models.topping_fingerprint as of this migration.
+    if not topping_ids:
+        return ""
+    canonical = ",".join(str(pk) for pk in sorted(set(topping_ids)))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def populate_topping_fingerprints(apps, schema_editor):
+    Pizza = apps.get_model("portal", "Pizza")
+    for pizza in Pizza.objects.prefetch_related("toppings"):
+        topping_ids = [topping.pk for topping in pizza.toppings.all()]
+        pizza.topping_fingerprint = topping_fingerprint(topping_ids)
+        pizza.save(update_fields=["topping_fingerprint"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0004_alter_pizza_cost_alter_topping_additional_cost"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pizza",
+            name="topping_fingerprint",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=64
+            ),
+        ),
+        migrations.RunPython(
+            populate_topping_fingerprints, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:32
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0005_pizza_topping_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pizza',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='portal_pizza_lower_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topping',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='portal_topping_lower_name_idx'),
+        ),
+    ]
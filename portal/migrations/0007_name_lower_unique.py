@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0006_name_lower_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="pizza",
+            name="portal_pizza_lower_name_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="topping",
+            name="portal_topping_lower_name_idx",
+        ),
+        migrations.AlterField(
+            model_name="pizza",
+            name="name",
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="topping",
+            name="name",
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name="pizza",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("name"),
+                name="portal_pizza_lower_name_unique",
+                violation_error_message="Pizza with this Name already exists.",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="topping",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("name"),
+                name="portal_topping_lower_name_unique",
+                violation_error_message="Topping with this Name already exists.",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.4 on 2026-10-17 12:52
+
+from django.db import migrations, models
+from django.db.models import (
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+
+def populate_total_costs(apps, schema_editor):
+    Pizza = apps.get_model("portal", "Pizza")
+    topping_costs = (
+        Pizza.toppings.through.objects.filter(pizza=OuterRef("pk"))
+        .values("pizza")
+        .annotate(topping_costs=Sum("topping__additional_cost"))
+        .values("topping_costs")
+    )
+    Pizza.objects.update(
+        total_cost=ExpressionWrapper(
+            F("cost") + Coalesce(Subquery(topping_costs), Value(0)),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0007_name_lower_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pizza",
+            name="total_cost",
+            field=models.DecimalField(
+                blank=True,
+                db_index=True,
+                decimal_places=2,
+                default=0.0,
+                editable=False,
+                max_digits=10,
+            ),
+        ),
+        migrations.RunPython(populate_total_costs, migrations.RunPython.noop),
+    ]
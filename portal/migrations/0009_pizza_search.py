@@ -0,0 +1,180 @@
+# Full-text search index over pizza names, descriptions and topping names.
+# SQLite uses an FTS5 table and PostgreSQL a tsvector table with a GIN index;
+# both are kept current by triggers, so bulk writes stay in sync too.
+
+from django.db import migrations
+
+SQLITE_INDEX = """
+    INSERT INTO portal_pizza_search (rowid, name, description, toppings)
+    SELECT p.id, p.name, p.description, COALESCE((
+        SELECT group_concat(t.name, ' ')
+        FROM portal_pizza_toppings pt
+        JOIN portal_topping t ON t.id = pt.topping_id
+        WHERE pt.pizza_id = p.id
+    ), '')
+    FROM portal_pizza p WHERE p.id {match}
+"""
+
+SQLITE_REFRESH = (
+    "DELETE FROM portal_pizza_search WHERE rowid {match}; " + SQLITE_INDEX + ";"
+)
+
+SQLITE_TRIGGERS = {
+    "portal_pizza_search_pizza_insert": (
+        "AFTER INSERT ON portal_pizza",
+        SQLITE_REFRESH.format(match="= NEW.id"),
+    ),
+    "portal_pizza_search_pizza_update": (
+        "AFTER UPDATE OF name, description ON portal_pizza",
+        SQLITE_REFRESH.format(match="= NEW.id"),
+    ),
+    "portal_pizza_search_pizza_delete": (
+        "AFTER DELETE ON portal_pizza",
+        "DELETE FROM portal_pizza_search WHERE rowid = OLD.id;",
+    ),
+    "portal_pizza_search_link_insert": (
+        "AFTER INSERT ON portal_pizza_toppings",
+        SQLITE_REFRESH.format(match="= NEW.pizza_id"),
+    ),
+    "portal_pizza_search_link_delete": (
+        "AFTER DELETE ON portal_pizza_toppings",
+        SQLITE_REFRESH.format(match="= OLD.pizza_id"),
+    ),
+    "portal_pizza_search_topping_update": (
+        "AFTER UPDATE OF name ON portal_topping",
+        SQLITE_REFRESH.format(
+            match="IN (SELECT pizza_id FROM portal_pizza_toppings "
+            "WHERE topping_id = NEW.id)"
+        ),
+    ),
+}
+
+POSTGRESQL_CREATE = [
+    """
+    CREATE TABLE portal_pizza_search (
+        pizza_id bigint PRIMARY KEY
+            REFERENCES portal_pizza (id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX portal_pizza_search_document_idx
+    ON portal_pizza_search USING gin (document)
+    """,
+    """
+    CREATE FUNCTION portal_pizza_search_refresh(pizza_ids bigint[])
+    RETURNS void AS $$
+    BEGIN
+        DELETE FROM portal_pizza_search WHERE pizza_id = ANY (pizza_ids);
+        INSERT INTO portal_pizza_search (pizza_id, document)
+        SELECT
+            p.id,
+            setweight(to_tsvector('simple', p.name), 'A')
+            || setweight(to_tsvector('simple', COALESCE((
+                SELECT string_agg(t.name, ' ')
+                FROM portal_pizza_toppings pt
+                JOIN portal_topping t ON t.id = pt.topping_id
+                WHERE pt.pizza_id = p.id
+            ), '')), 'B')
+            || setweight(to_tsvector('simple', p.description), 'C')
+        FROM portal_pizza p WHERE p.id = ANY (pizza_ids);
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION portal_pizza_search_pizza_trigger() RETURNS trigger AS $$
+    BEGIN
+        PERFORM portal_pizza_search_refresh(ARRAY[NEW.id]);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER portal_pizza_search_pizza
+    AFTER INSERT OR UPDATE OF name, description ON portal_pizza
+    FOR EACH ROW EXECUTE FUNCTION portal_pizza_search_pizza_trigger()
+    """,
+    """
+    CREATE FUNCTION portal_pizza_search_link_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM portal_pizza_search_refresh(ARRAY[OLD.pizza_id]);
+        ELSE
+            PERFORM portal_pizza_search_refresh(ARRAY[NEW.pizza_id]);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER portal_pizza_search_link
+    AFTER INSERT OR DELETE ON portal_pizza_toppings
+    FOR EACH ROW EXECUTE FUNCTION portal_pizza_search_link_trigger()
+    """,
+    """
+    CREATE FUNCTION portal_pizza_search_topping_trigger() RETURNS trigger AS $$
+    BEGIN
+        PERFORM portal_pizza_search_refresh(ARRAY(
+            SELECT pizza_id FROM portal_pizza_toppings WHERE topping_id = NEW.id
+        ));
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER portal_pizza_search_topping
+    AFTER UPDATE OF name ON portal_topping
+    FOR EACH ROW EXECUTE FUNCTION portal_pizza_search_topping_trigger()
+    """,
+    "SELECT portal_pizza_search_refresh(ARRAY(SELECT id FROM portal_pizza))",
+]
+
+POSTGRESQL_DROP = [
+    "DROP TABLE IF EXISTS portal_pizza_search",
+    "DROP FUNCTION IF EXISTS portal_pizza_search_topping_trigger() CASCADE",
+    "DROP FUNCTION IF EXISTS portal_pizza_search_link_trigger() CASCADE",
+    "DROP FUNCTION IF EXISTS portal_pizza_search_pizza_trigger() CASCADE",
+    "DROP FUNCTION IF EXISTS portal_pizza_search_refresh(bigint[])",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE portal_pizza_search USING fts5("
+            "name, description, toppings, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        for name, (event, body) in SQLITE_TRIGGERS.items():
+            schema_editor.execute(
+                f"CREATE TRIGGER {name} {event} FOR EACH ROW BEGIN {body} END"
+            )
+        schema_editor.execute(
+            SQLITE_INDEX.format(match="IN (SELECT id FROM portal_pizza)")
+        )
+    elif vendor == "postgresql":
+        for statement in POSTGRESQL_CREATE:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for name in SQLITE_TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        schema_editor.execute("DROP TABLE IF EXISTS portal_pizza_search")
+    elif vendor == "postgresql":
+        for statement in POSTGRESQL_DROP:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0008_pizza_total_cost"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
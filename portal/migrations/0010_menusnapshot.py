@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-17 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0009_pizza_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MenuSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField(editable=False, unique=True)),
+                ("published_at", models.DateTimeField(auto_now_add=True)),
+                ("document", models.TextField(editable=False)),
+                ("checksum", models.CharField(editable=False, max_length=64)),
+                ("is_current", models.BooleanField(default=False, editable=False)),
+            ],
+            options={
+                "ordering": ["-version"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("is_current", True)),
+                        fields=("is_current",),
+                        name="portal_menusnapshot_single_current",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,10 +1,49 @@
-from django.db import models
+import hashlib
+from collections import defaultdict
+from decimal import Decimal
+from django.db import models, router, transaction
+from django.db.models import (
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Lower, Round
 from django.core.validators import MinValueValidator
 
+CENTS = Decimal("0.01")
+
+
+class ToppingQuerySet(models.QuerySet):
+    def delete_dependent_pizzas(self):
+        """
+        Delete, set-based, every pizza that uses one of these toppings, along
+        with the pizzas' links to other toppings. Returns the number of links
+        and pizzas deleted.
+        """
+        using = self.db
+        through = Pizza.toppings.through
+        topping_ids = self.values("pk")
+        parent_ids = (
+            through.objects.using(using).filter(topping__in=topping_ids).values("pizza")
+        )
+        with transaction.atomic(using=using):
+            sibling_links = (
+                through.objects.using(using)
+                .filter(pizza__in=parent_ids)
+                .exclude(topping__in=topping_ids)
+            )
+            links_deleted, _ = sibling_links.delete()
+            parents = Pizza.objects.using(using).filter(pk__in=parent_ids)
+            pizzas_deleted = parents._raw_delete(using)
+        return links_deleted, pizzas_deleted
+
 
 class Topping(models.Model):
     name = models.CharField(
-        unique=True,
         blank=False,
         null=False,
         max_length=50,
@@ -20,20 +59,125 @@ class Topping(models.Model):
         ],
     )
 
+    objects = ToppingQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                Lower("name"),
+                name="portal_topping_lower_name_unique",
+                violation_error_message="Topping with this Name already exists.",
+            ),
+        ]
+
     def __str__(self):
         cost_text = " ($" + self.additional_cost.to_eng_string() + ")"
         return self.name + ("", cost_text)[self.additional_cost > 0]
 
-    def delete(self, *args, **kwargs):
-        parents = Pizza.objects.filter(toppings__in=[self])
-        for parent in parents:
-            parent.delete()
-        super().delete(**kwargs)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_additional_cost = instance.__dict__.get("additional_cost")
+        return instance
+
+    def save(self, *args, **kwargs):
+        field = self._meta.get_field("additional_cost")
+        cost = field.to_python(self.additional_cost)
+        cost_changed = not self._state.adding and cost != getattr(
+            self, "_loaded_additional_cost", None
+        )
+        using = kwargs.get("using") or router.db_for_write(Topping, instance=self)
+        with transaction.atomic(using=using):
+            if cost_changed:
+                # Read before saving, for the post_save handler to report the
+                # repriced pizzas in the menu change event.
+                self._repriced_pizza_ids = list(
+                    self.dependent_pizzas().using(using).values_list("pk", flat=True)
+                )
+            super().save(*args, **kwargs)
+            if cost_changed:
+                # One UPDATE refreshes the stored total of every pizza using it.
+                self.dependent_pizzas().using(using).refresh_total_costs()
+        self._loaded_additional_cost = cost
+
+    def dependent_pizzas(self):
+        return Pizza.objects.filter(toppings=self)
+
+    def deletion_impact(self):
+        from .topping_index import pizzas_with_any_topping
+
+        return len(pizzas_with_any_topping([self.pk]))
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(Topping, instance=self)
+        through = Pizza.toppings.through
+        with transaction.atomic(using=using):
+            toppings = Topping.objects.using(using).filter(pk=self.pk)
+            # The pizzas go without signals; the post_delete handler reports
+            # them in the menu change event.
+            self._deleted_pizza_ids = list(
+                self.dependent_pizzas().using(using).values_list("pk", flat=True)
+            )
+            links_deleted, pizzas_deleted = toppings.delete_dependent_pizzas()
+            deleted, rows_per_model = super().delete(using, keep_parents)
+
+        if links_deleted:
+            label = through._meta.label
+            rows_per_model[label] = rows_per_model.get(label, 0) + links_deleted
+        if pizzas_deleted:
+            rows_per_model[Pizza._meta.label] = pizzas_deleted
+        return deleted + links_deleted + pizzas_deleted, rows_per_model
+
+
+def topping_fingerprint(topping_ids):
+    if not topping_ids:
+        return ""
+    canonical = ",".join(str(pk) for pk in sorted(set(topping_ids)))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class PizzaQuerySet(models.QuerySet):
+    def with_topping_set(self, topping_ids):
+        return self.filter(topping_fingerprint=topping_fingerprint(topping_ids))
+
+    def refresh_topping_fingerprints(self):
+        pizzas = list(self.only("pk", "topping_fingerprint"))
+        topping_ids = defaultdict(list)
+        links = Pizza.toppings.through.objects.filter(pizza__in=pizzas)
+        for pizza_id, topping_id in links.values_list("pizza_id", "topping_id"):
+            topping_ids[pizza_id].append(topping_id)
+        for pizza in pizzas:
+            pizza.topping_fingerprint = topping_fingerprint(topping_ids[pizza.pk])
+        Pizza.objects.bulk_update(pizzas, ["topping_fingerprint"])
+
+    def computed_total_cost(self):
+        topping_costs = (
+            Pizza.toppings.through.objects.filter(
+                pizza=OuterRef("pk"), topping__additional_cost__gt=0
+            )
+            .values("pizza")
+            .annotate(topping_costs=Sum("topping__additional_cost"))
+            .values("topping_costs")
+        )
+        # Rounded in SQL so set-based refreshes store the same cents as
+        # Pizza.save; SQLite sums decimals as floats.
+        return Round(
+            ExpressionWrapper(
+                F("cost") + Coalesce(Subquery(topping_costs), Value(0)),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ),
+            2,
+        )
+
+    def with_total_cost(self):
+        return self.annotate(total=self.computed_total_cost())
+
+    def refresh_total_costs(self):
+        return self.update(total_cost=self.computed_total_cost())
 
 
 class Pizza(models.Model):
     name = models.CharField(
-        unique=True,
         max_length=100,
         blank=False,
         null=False,
@@ -56,12 +200,69 @@ class Pizza(models.Model):
         to=Topping,
         blank=False,
     )
+    topping_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        null=False,
+        default="",
+        editable=False,
+        db_index=True,
+    )
+
+    total_cost = models.DecimalField(
+        blank=True,
+        null=False,
+        default=0.00,
+        max_digits=10,
+        decimal_places=2,
+        editable=False,
+        db_index=True,
+    )
+
+    objects = PizzaQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                Lower("name"),
+                name="portal_pizza_lower_name_unique",
+                violation_error_message="Pizza with this Name already exists.",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
-    def total_cost(self):
-        topping_costs = 0.00
-        for topping in self.toppings.filter(additional_cost__gt=0):
-            topping_costs += float(topping.additional_cost)
-        return float(self.cost) + topping_costs
+    def save(self, *args, **kwargs):
+        # Topping changes keep total_cost current; only the base cost is
+        # folded in here.
+        cost = self._meta.get_field("cost").to_python(self.cost)
+        if cost is not None:
+            topping_costs = Decimal(0)
+            if not self._state.adding:
+                topping_costs = self.toppings.aggregate(
+                    total=Coalesce(Sum("additional_cost"), Value(Decimal(0)))
+                )["total"]
+            self.total_cost = (cost + topping_costs).quantize(CENTS)
+        super().save(*args, **kwargs)
+
+
+class MenuSnapshot(models.Model):
+    version = models.PositiveIntegerField(unique=True, editable=False)
+    published_at = models.DateTimeField(auto_now_add=True)
+    document = models.TextField(editable=False)
+    checksum = models.CharField(max_length=64, editable=False)
+    is_current = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        ordering = ["-version"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["is_current"],
+                condition=models.Q(is_current=True),
+                name="portal_menusnapshot_single_current",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Menu snapshot {self.version}"
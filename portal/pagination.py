@@ -0,0 +1,34 @@
+from django.db.models import Value
+from django.db.models.functions import Concat, Lower
+
+# Sorts after every other code point, so "prefix" <= name < "prefix" + PREFIX_END
+# is a range scan over the lower(name) index rather than a LIKE.
+PREFIX_END = "\U0010ffff"
+
+
+def keyset_queryset(queryset, query="", after="", page_size=50):
+    queryset = queryset.annotate(lower_name=Lower("name")).order_by("lower_name")
+    if query:
+        prefix = Lower(Value(query))
+        queryset = queryset.filter(
+            lower_name__gte=prefix,
+            lower_name__lt=Concat(prefix, Value(PREFIX_END)),
+        )
+    if after:
+        queryset = queryset.filter(lower_name__gt=after)
+    return queryset[: page_size + 1]
+
+
+def split_page(items, page_size):
+    next_cursor = items[page_size - 1].lower_name if len(items) > page_size else ""
+    return items[:page_size], next_cursor
+
+
+def keyset_page(queryset, query="", after="", page_size=50):
+    items = list(keyset_queryset(queryset, query, after, page_size))
+    return split_page(items, page_size)
+
+
+async def akeyset_page(queryset, query="", after="", page_size=50):
+    items = [item async for item in keyset_queryset(queryset, query, after, page_size)]
+    return split_page(items, page_size)
@@ -0,0 +1,65 @@
+import re
+from django.db import NotSupportedError, connection
+from .models import Pizza
+
+# Created by migration 0009 and kept in sync by database triggers.
+SEARCH_TABLE = "portal_pizza_search"
+TERM = re.compile(r"\w+")
+
+SQLITE_SEARCH = f"""
+    SELECT portal_pizza.*
+    FROM {SEARCH_TABLE}
+    JOIN portal_pizza ON portal_pizza.id = {SEARCH_TABLE}.rowid
+    WHERE {SEARCH_TABLE} MATCH %s
+    ORDER BY bm25({SEARCH_TABLE}, 10.0, 1.0, 5.0), portal_pizza.name
+    LIMIT %s OFFSET %s
+"""
+
+POSTGRESQL_SEARCH = f"""
+    SELECT portal_pizza.*
+    FROM {SEARCH_TABLE}
+    JOIN portal_pizza ON portal_pizza.id = {SEARCH_TABLE}.pizza_id,
+        to_tsquery('simple', %s) AS query
+    WHERE {SEARCH_TABLE}.document @@ query
+    ORDER BY ts_rank({SEARCH_TABLE}.document, query) DESC, portal_pizza.name
+    LIMIT %s OFFSET %s
+"""
+
+
+def search_terms(query):
+    return TERM.findall(query.lower())
+
+
+def search_pizzas(query, limit=50, offset=0):
+    """
+    Rank pizzas whose name, description or topping names contain words
+    starting with every term in ``query``. Name matches rank highest, then
+    toppings, then description.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == "sqlite":
+        sql = SQLITE_SEARCH
+        expression = " ".join(f'"{term}"*' for term in terms)
+    elif connection.vendor == "postgresql":
+        sql = POSTGRESQL_SEARCH
+        expression = " & ".join(f"{term}:*" for term in terms)
+    else:
+        raise NotSupportedError(
+            f"Full-text search is not available on {connection.vendor}."
+        )
+    return list(Pizza.objects.raw(sql, [expression, limit, offset]))
+
+
+def search_page(query, after="", page_size=50):
+    """
+    Return one page of ``search_pizzas`` results and the cursor of the next.
+    Ranks shift as the index changes, so the cursor is a plain offset rather
+    than a keyset.
+    """
+    offset = int(after) if after.isdecimal() else 0
+    items = search_pizzas(query, page_size + 1, offset)
+    next_cursor = str(offset + page_size) if len(items) > page_size else ""
+    return items[:page_size], next_cursor
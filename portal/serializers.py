@@ -0,0 +1,31 @@
+from .models import Pizza, Topping
+
+
+def serialize_topping(topping):
+    return {
+        "id": topping.pk,
+        "name": topping.name,
+        "additional_cost": str(topping.additional_cost),
+    }
+
+
+def serialize_pizza(pizza):
+    return {
+        "id": pizza.pk,
+        "name": pizza.name,
+        "description": pizza.description,
+        "cost": str(pizza.cost),
+        "total_cost": str(pizza.total_cost),
+        "toppings": [
+            {"id": topping.pk, "name": topping.name} for topping in pizza.toppings.all()
+        ],
+    }
+
+
+def serialize_menu():
+    pizzas = Pizza.objects.prefetch_related("toppings").order_by("pk")
+    toppings = Topping.objects.order_by("pk")
+    return {
+        "pizzas": [serialize_pizza(pizza) for pizza in pizzas],
+        "toppings": [serialize_topping(topping) for topping in toppings],
+    }
@@ -0,0 +1,62 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .events import notify_menu_change
+from .menu_cache import bump_menu_version
+from .models import CENTS, Pizza, Topping, topping_fingerprint
+
+
+@receiver(m2m_changed, sender=Pizza.toppings.through)
+def update_topping_summary(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action == "pre_clear":
+            instance._cleared_pizza_ids = list(
+                instance.pizza_set.values_list("pk", flat=True)
+            )
+        elif action == "post_clear":
+            pizza_ids = instance.__dict__.pop("_cleared_pizza_ids", [])
+            pizzas = Pizza.objects.filter(pk__in=pizza_ids)
+            pizzas.refresh_topping_fingerprints()
+            pizzas.refresh_total_costs()
+        elif action in ("post_add", "post_remove"):
+            pizzas = Pizza.objects.filter(pk__in=pk_set)
+            pizzas.refresh_topping_fingerprints()
+            pizzas.refresh_total_costs()
+        return
+
+    if action in ("post_add", "post_remove", "post_clear"):
+        toppings = list(instance.toppings.values_list("pk", "additional_cost"))
+        cost = Pizza._meta.get_field("cost").to_python(instance.cost)
+        topping_costs = sum(additional_cost for _, additional_cost in toppings)
+        instance.topping_fingerprint = topping_fingerprint([pk for pk, _ in toppings])
+        instance.total_cost = (cost + topping_costs).quantize(CENTS)
+        Pizza.objects.filter(pk=instance.pk).update(
+            topping_fingerprint=instance.topping_fingerprint,
+            total_cost=instance.total_cost,
+        )
+
+
+@receiver(post_save, sender=Pizza)
+@receiver(post_save, sender=Topping)
+@receiver(post_delete, sender=Pizza)
+@receiver(post_delete, sender=Topping)
+def invalidate_menu_on_change(sender, instance, **kwargs):
+    bump_menu_version()
+    if sender is Pizza:
+        notify_menu_change(pizzas=[instance.pk])
+    else:
+        pizza_ids = instance.__dict__.pop(
+            "_deleted_pizza_ids", instance.__dict__.pop("_repriced_pizza_ids", [])
+        )
+        notify_menu_change(pizzas=pizza_ids, toppings=[instance.pk])
+
+
+@receiver(m2m_changed, sender=Pizza.toppings.through)
+def invalidate_menu_on_topping_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_menu_version()
+        if reverse:
+            notify_menu_change(pizzas=pk_set or (), toppings=[instance.pk])
+        else:
+            notify_menu_change(pizzas=[instance.pk], toppings=pk_set or ())
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from .models import MenuSnapshot, Pizza, Topping
+from .serializers import serialize_topping
+
+CURRENT_FILE = "current.json"
+# Checksum of the current snapshot, shared so every host notices a publish or
+# rollback made on another one.
+CURRENT_KEY = "portal:snapshot:current"
+
+# Bytes of the current snapshot file, keyed on its (mtime, size).
+_current_file_cache = {}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def snapshot_dir():
+    return Path(settings.PORTAL_SNAPSHOT_DIR)
+
+
+def snapshot_path(version):
+    return snapshot_dir() / f"menu-{version}.json"
+
+
+def build_document(version):
+    pizzas = Pizza.objects.prefetch_related("toppings").order_by("pk")
+    document = {
+        "version": version,
+        "published_at": timezone.now().isoformat(),
+        "pizzas": [
+            {
+                "id": pizza.pk,
+                "name": pizza.name,
+                "description": pizza.description,
+                "cost": str(pizza.cost),
+                "total_cost": str(pizza.total_cost),
+                "toppings": [topping.pk for topping in pizza.toppings.all()],
+            }
+            for pizza in pizzas
+        ],
+        "toppings": [
+            serialize_topping(topping) for topping in Topping.objects.order_by("pk")
+        ],
+    }
+    return json.dumps(document, separators=(",", ":"), ensure_ascii=False)
+
+
+def write_file(path, content):
+    # Write to a temporary file and rename it over the target, so readers
+    # never see a partly written snapshot.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as output:
+            output.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+
+
+def write_snapshot_files(snapshot):
+    write_file(snapshot_path(snapshot.version), snapshot.document)
+    write_file(snapshot_dir() / CURRENT_FILE, snapshot.document)
+    cache.set(CURRENT_KEY, snapshot.checksum, None)
+
+
+def prune_snapshots(keep):
+    stale = MenuSnapshot.objects.filter(is_current=False).order_by("-version")[keep:]
+    versions = list(stale.values_list("version", flat=True))
+    MenuSnapshot.objects.filter(version__in=versions).delete()
+    for version in versions:
+        snapshot_path(version).unlink(missing_ok=True)
+    return versions
+
+
+def make_current(snapshot):
+    MenuSnapshot.objects.filter(is_current=True).update(is_current=False)
+    MenuSnapshot.objects.filter(pk=snapshot.pk).update(is_current=True)
+    snapshot.is_current = True
+    transaction.on_commit(lambda: write_snapshot_files(snapshot))
+
+
+def publish_menu(keep=None):
+    """
+    Serialize the whole menu into a new current snapshot, and keep up to
+    ``keep`` earlier ones for rollback.
+    """
+    keep = settings.PORTAL_SNAPSHOT_KEEP if keep is None else keep
+    with transaction.atomic():
+        latest = MenuSnapshot.objects.aggregate(version=Max("version"))["version"]
+        version = (latest or 0) + 1
+        document = build_document(version)
+        snapshot = MenuSnapshot.objects.create(
+            version=version,
+            document=document,
+            checksum=hashlib.sha256(document.encode()).hexdigest(),
+        )
+        make_current(snapshot)
+        prune_snapshots(keep)
+    return snapshot
+
+
+def rollback_menu(version=None):
+    """
+    Make an earlier snapshot current again, by default the one published
+    before the current snapshot.
+    """
+    with transaction.atomic():
+        current = MenuSnapshot.objects.filter(is_current=True).first()
+        snapshots = MenuSnapshot.objects.select_for_update()
+        if version is not None:
+            snapshot = snapshots.filter(version=version).first()
+        elif current is not None:
+            snapshot = snapshots.filter(version__lt=current.version).first()
+        else:
+            snapshot = None
+        if snapshot is None:
+            raise SnapshotError("No snapshot to roll back to.")
+        make_current(snapshot)
+    return snapshot
+
+
+def current_checksum():
+    """
+    Return the current snapshot's checksum, or ``""`` before anything has been
+    published. Only read from the database when the cache has lost it.
+    """
+    checksum = cache.get(CURRENT_KEY)
+    if checksum is None:
+        current = MenuSnapshot.objects.filter(is_current=True)
+        checksum = current.values_list("checksum", flat=True).first() or ""
+        cache.add(CURRENT_KEY, checksum, None)
+    return checksum
+
+
+def read_current_file(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    cached = _current_file_cache.get(str(path))
+    if cached is None or cached[0] != key:
+        content = path.read_bytes()
+        cached = (key, content, hashlib.sha256(content).hexdigest())
+        _current_file_cache[str(path)] = cached
+    return cached[1], cached[2]
+
+
+def read_current_snapshot():
+    """
+    Return the current snapshot's JSON bytes and checksum from disk, or
+    ``None`` before anything has been published. The file is rewritten from
+    the database when it is missing or its checksum no longer matches the
+    shared current one, e.g. after a publish on another host.
+    """
+    checksum = current_checksum()
+    if not checksum:
+        return None
+    path = snapshot_dir() / CURRENT_FILE
+    current = read_current_file(path)
+    if current is None or current[1] != checksum:
+        snapshot = MenuSnapshot.objects.filter(is_current=True).first()
+        if snapshot is None:
+            return None
+        write_snapshot_files(snapshot)
+        current = read_current_file(path)
+    return current
@@ -0,0 +1,83 @@
+(function () {
+    "use strict";
+
+    function attach(select) {
+        if (select.dataset.autocompleteAttached) {
+            return;
+        }
+        select.dataset.autocompleteAttached = "true";
+
+        var input = document.createElement("input");
+        var results = document.createElement("ul");
+        var pending = null;
+
+        input.type = "search";
+        input.placeholder = "Search toppings";
+        input.autocomplete = "off";
+        results.className = "autocomplete-results";
+        select.parentNode.insertBefore(input, select);
+        select.parentNode.insertBefore(results, select.nextSibling);
+
+        function addOption(topping) {
+            var value = String(topping.id);
+            for (var i = 0; i < select.options.length; i++) {
+                if (select.options[i].value === value) {
+                    select.options[i].selected = true;
+                    return;
+                }
+            }
+            select.add(new Option(topping.label, value, true, true));
+        }
+
+        function show(toppings) {
+            results.innerHTML = "";
+            toppings.forEach(function (topping) {
+                var item = document.createElement("li");
+                var button = document.createElement("button");
+                button.type = "button";
+                button.textContent = topping.label;
+                button.addEventListener("click", function () {
+                    addOption(topping);
+                    results.innerHTML = "";
+                    input.value = "";
+                    input.focus();
+                });
+                item.appendChild(button);
+                results.appendChild(item);
+            });
+        }
+
+        function search() {
+            var url = select.dataset.autocompleteUrl + "?q=" + encodeURIComponent(input.value.trim());
+            fetch(url, { headers: { Accept: "application/json" } })
+                .then(function (response) { return response.json(); })
+                .then(function (data) { show(data.results); });
+        }
+
+        input.addEventListener("input", function () {
+            clearTimeout(pending);
+            pending = setTimeout(search, 150);
+        });
+
+        // Deselected options are dropped so only the chosen ids are posted.
+        select.addEventListener("change", function () {
+            for (var i = select.options.length - 1; i >= 0; i--) {
+                if (!select.options[i].selected) {
+                    select.remove(i);
+                }
+            }
+        });
+    }
+
+    function attachAll(root) {
+        root.querySelectorAll("select[data-autocomplete-url]").forEach(attach);
+    }
+
+    document.addEventListener("DOMContentLoaded", function () {
+        attachAll(document);
+    });
+    // Forms swapped in by fragments.js.
+    document.addEventListener("portal:fragment", function (event) {
+        attachAll(event.target);
+    });
+})();
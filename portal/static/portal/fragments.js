@@ -0,0 +1,85 @@
+(function () {
+    "use strict";
+
+    // Forms marked with data-fragment are submitted with fetch to their
+    // fragment endpoint, and the returned HTML replaces the form slot or an
+    // item row in place. Without this script they fall back to full pages.
+
+    function slot() {
+        return document.getElementById("item-form-slot");
+    }
+
+    function parse(html) {
+        var template = document.createElement("template");
+        template.innerHTML = html.trim();
+        return template.content.firstElementChild;
+    }
+
+    function showForm(html) {
+        var container = slot();
+        container.innerHTML = html;
+        var form = container.querySelector("#item-form-container");
+        if (form) {
+            form.style.display = "block";
+        }
+        container.dispatchEvent(new CustomEvent("portal:fragment", { bubbles: true }));
+    }
+
+    function itemRow(id) {
+        return document.querySelector('.item-elem[data-item-id="' + id + '"]');
+    }
+
+    function applyResult(response, html) {
+        if (response.status === 204) {
+            var deleted = itemRow(response.headers.get("X-Portal-Item"));
+            if (deleted) {
+                deleted.remove();
+            }
+            slot().innerHTML = "";
+        } else if (response.status === 200 || response.status === 201) {
+            var row = parse(html);
+            var existing = itemRow(row.dataset.itemId);
+            if (existing) {
+                existing.replaceWith(row);
+            } else {
+                document.querySelector(".item-container").appendChild(row);
+            }
+            slot().innerHTML = "";
+        } else {
+            showForm(html);
+        }
+    }
+
+    document.addEventListener("submit", function (event) {
+        var form = event.target;
+        if (form.hasAttribute("data-fragment-close") && slot().contains(form)) {
+            event.preventDefault();
+            slot().innerHTML = "";
+            return;
+        }
+        if (!form.dataset.fragment) {
+            return;
+        }
+        event.preventDefault();
+
+        var post = form.method.toLowerCase() === "post";
+        fetch(form.dataset.fragment, {
+            method: post ? "POST" : "GET",
+            body: post ? new FormData(form) : undefined,
+            credentials: "same-origin",
+        }).then(function (response) {
+            if (response.redirected) {
+                // Signed out: let the server's redirect take over.
+                window.location.assign(response.url);
+                return;
+            }
+            return response.text().then(function (html) {
+                if (post) {
+                    applyResult(response, html);
+                } else {
+                    showForm(html);
+                }
+            });
+        });
+    });
+})();
@@ -0,0 +1,98 @@
+import gzip
+import posixpath
+from io import BytesIO
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".json", ".map", ".svg", ".txt", ".ico"}
+
+
+def image_variant_name(name, width):
+    root, ext = posixpath.splitext(name)
+    return f"{root}-{width}{ext}"
+
+
+class PortalStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes a gzip copy of every compressible file,
+    and resized variants of the images in IMAGE_VARIANTS when Pillow is
+    installed. Without a manifest (before collectstatic has run) URLs fall
+    back to the plain file names.
+    """
+
+    image_variants = {"background.jpg": (640, 1280, 1920)}
+    image_quality = 80
+
+    def read_manifest(self):
+        if self.base_location is None:
+            # STATIC_ROOT is unset, so nothing has been collected.
+            return None
+        return super().read_manifest()
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+
+        for name, variant in self.save_image_variants(paths):
+            paths[variant] = (self, variant)
+            yield name, variant, True
+        yield from super().post_process(paths, dry_run, **options)
+
+        for name, hashed_name in list(self.hashed_files.items()):
+            for path in {name, hashed_name}:
+                if self.save_compressed(path):
+                    yield path, f"{path}.gz", True
+
+    def save_image_variants(self, paths):
+        if Image is None:
+            return
+
+        for name, widths in self.image_variants.items():
+            if name not in paths:
+                continue
+            with self.open(name) as source, Image.open(source) as image:
+                image.load()
+            for width in widths:
+                if width >= image.width:
+                    continue
+                height = round(image.height * width / image.width)
+                buffer = BytesIO()
+                image.resize((width, height), Image.LANCZOS).save(
+                    buffer,
+                    format=image.format,
+                    quality=self.image_quality,
+                    optimize=True,
+                    progressive=True,
+                )
+                variant = image_variant_name(name, width)
+                if self.exists(variant):
+                    self.delete(variant)
+                self._save(variant, ContentFile(buffer.getvalue()))
+                yield name, variant
+
+    def save_compressed(self, path):
+        if posixpath.splitext(path)[1] not in COMPRESSIBLE_EXTENSIONS:
+            return False
+        if not self.exists(path):
+            return False
+
+        with self.open(path) as original:
+            content = original.read()
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) >= len(content):
+            return False
+        compressed_path = f"{path}.gz"
+        if self.exists(compressed_path):
+            self.delete(compressed_path)
+        self._save(compressed_path, ContentFile(compressed))
+        return True
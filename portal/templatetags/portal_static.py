@@ -0,0 +1,31 @@
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.utils.html import format_html, format_html_join
+from ..storage import image_variant_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_background(name, selector="body"):
+    """
+    Media queries that swap in the collected, resized variants of a CSS
+    background image. Renders nothing until collectstatic has built them.
+    """
+    hashed_files = getattr(staticfiles_storage, "hashed_files", {})
+    widths = getattr(staticfiles_storage, "image_variants", {}).get(name, ())
+    rules = [
+        (width, selector, staticfiles_storage.url(image_variant_name(name, width)))
+        for width in sorted(widths, reverse=True)
+        if image_variant_name(name, width) in hashed_files
+    ]
+    if not rules:
+        return ""
+    return format_html(
+        "<style>{}</style>",
+        format_html_join(
+            "",
+            "@media (max-width: {}px) {{ {} {{ background-image: url('{}'); }} }}",
+            rules,
+        ),
+    )
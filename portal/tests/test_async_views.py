@@ -0,0 +1,121 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, AsyncClient, override_settings
+from django.urls import include, path, reverse
+from pages.views import home_view
+from ..models import Pizza, Topping
+from ..urls import async_urlpatterns
+
+urlpatterns = [
+    path("", home_view, name="home"),
+    path("portal/", include(async_urlpatterns)),
+    path("accounts/", include("django.contrib.auth.urls")),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncPortalViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.STATUS_OK = 200
+        self.client = AsyncClient()
+        self.owner_user = get_user_model().objects.create_user(
+            username="test_owner",
+            password="test_password",
+            account_type="owner",
+        )
+        self.chef_user = get_user_model().objects.create_user(
+            username="test_chef",
+            password="test_password",
+            account_type="chef",
+        )
+        self.staff_user = get_user_model().objects.create_user(
+            username="test_staff",
+            password="test_password",
+            account_type="owner",
+            is_staff=True,
+        )
+        self.topping = Topping.objects.create(name="Cheese")
+        self.pizza = Pizza.objects.create(name="Cheese Pizza", cost=9.99)
+        self.pizza.toppings.add(self.topping)
+
+    async def test_unauthenticated_user_redirected_to_login(self):
+        response = await self.client.get(reverse("portal"))
+
+        self.assertRedirects(response, reverse("login"), fetch_redirect_response=False)
+
+    async def test_chef_portal_lists_pizzas(self):
+        await self.client.aforce_login(self.chef_user)
+        response = await self.client.get(reverse("portal"))
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertTemplateUsed(response, "portal.html")
+        self.assertEqual(list(response.context["items"]), [self.pizza])
+
+    async def test_owner_add_GET_renders_form(self):
+        await self.client.aforce_login(self.owner_user)
+        response = await self.client.get(reverse("add"))
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertTemplateUsed(response, "add.html")
+
+    async def test_owner_add_POST_creates_topping(self):
+        await self.client.aforce_login(self.owner_user)
+        response = await self.client.post(reverse("add"), {"name": "Olives"})
+
+        self.assertRedirects(response, reverse("portal"), fetch_redirect_response=False)
+        self.assertTrue(await Topping.objects.filter(name="Olives").aexists())
+
+    async def test_invalid_chef_add_POST_returns_form(self):
+        await self.client.aforce_login(self.chef_user)
+        response = await self.client.post(reverse("add"), {})
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertTemplateUsed(response, "add.html")
+
+    async def test_chef_edit_GET_and_POST(self):
+        await self.client.aforce_login(self.chef_user)
+        url = reverse("edit", kwargs={"item_id": self.pizza.id})
+        response = await self.client.get(url)
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertTemplateUsed(response, "edit.html")
+
+        data = {
+            "name": "Extra Cheese Pizza",
+            "cost": "10.99",
+            "toppings": [self.topping.id],
+        }
+        response = await self.client.post(url, data)
+
+        self.assertRedirects(response, reverse("portal"), fetch_redirect_response=False)
+        await self.pizza.arefresh_from_db()
+        self.assertEqual(self.pizza.name, "Extra Cheese Pizza")
+
+    async def test_owner_edit_GET_reports_deletion_impact(self):
+        await self.client.aforce_login(self.owner_user)
+        url = reverse("edit", kwargs={"item_id": self.topping.id})
+        response = await self.client.get(url)
+
+        self.assertEqual(response.context["deletion_impact"], 1)
+
+    async def test_missing_item_returns_404(self):
+        await self.client.aforce_login(self.chef_user)
+        response = await self.client.get(reverse("edit", kwargs={"item_id": 999}))
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_owner_delete_POST_cascades(self):
+        await self.client.aforce_login(self.owner_user)
+        url = reverse("delete", kwargs={"item_id": self.topping.id})
+        response = await self.client.post(url)
+
+        self.assertRedirects(response, reverse("portal"), fetch_redirect_response=False)
+        self.assertFalse(await Pizza.objects.aexists())
+
+    async def test_staff_export_streams_asynchronously(self):
+        await self.client.aforce_login(self.staff_user)
+        response = await self.client.get(reverse("export", args=["csv"]))
+
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertIn(b"pizza,Cheese Pizza,,9.99,Cheese,9.99", content)
@@ -0,0 +1,280 @@
+import json
+import random
+from decimal import Decimal
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from ..management.commands.benchmark_portal import Command as BenchmarkCommand
+from ..menu_import import MenuImporter, read_jsonl_rows
+from ..models import Pizza, Topping, topping_fingerprint
+
+
+class ImportMenuCommandTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, filename, content):
+        path = Path(self.directory.name) / filename
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def import_menu(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_menu", path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_creates_toppings_and_pizzas(self):
+        path = self.write(
+            "menu.csv",
+            "type,name,description,cost,toppings\n"
+            "topping,Cheese,,,\n"
+            "topping,Olives,,0.99,\n"
+            "pizza,Olive Pizza,Salty,9.99,Cheese;Olives\n",
+        )
+        out, err = self.import_menu(path)
+
+        pizza = Pizza.objects.get(name="Olive Pizza")
+        self.assertEqual(err, "")
+        self.assertIn("Imported 2 toppings and 1 pizzas from 3 rows (0 errors)", out)
+        self.assertEqual(
+            sorted(pizza.toppings.values_list("name", flat=True)), ["Cheese", "Olives"]
+        )
+        self.assertEqual(pizza.description, "Salty")
+        self.assertEqual(
+            pizza.topping_fingerprint,
+            topping_fingerprint(pizza.toppings.values_list("pk", flat=True)),
+        )
+        self.assertEqual(pizza.total_cost, Decimal("10.98"))
+
+    def test_jsonl_import_creates_pizzas(self):
+        Topping.objects.create(name="Cheese")
+        rows = [
+            {"type": "topping", "name": "Basil", "additional_cost": "0.25"},
+            {
+                "type": "pizza",
+                "name": "Margherita",
+                "cost": "8.99",
+                "toppings": ["cheese", "basil"],
+            },
+        ]
+        path = self.write("menu.jsonl", "\n".join(json.dumps(row) for row in rows))
+        out, err = self.import_menu(path)
+
+        self.assertEqual(err, "")
+        self.assertEqual(Pizza.objects.get(name="Margherita").toppings.count(), 2)
+        self.assertEqual(str(Topping.objects.get(name="Basil").additional_cost), "0.25")
+
+    def test_case_insensitive_name_clashes_are_reported(self):
+        Topping.objects.create(name="Cheese")
+        path = self.write(
+            "menu.csv",
+            "type,name,cost\n" "topping,cheese,\n" "topping,Ham,\n" "topping,HAM,\n",
+        )
+        out, err = self.import_menu(path, "--batch-size", "2")
+
+        self.assertIn("line 2: Topping with this Name already exists.", err)
+        self.assertIn("line 4: Topping with this Name already exists.", err)
+        self.assertEqual(Topping.objects.count(), 2)
+
+    def test_duplicate_topping_sets_are_reported(self):
+        cheese = Topping.objects.create(name="Cheese")
+        Pizza.objects.create(name="Cheese Pizza", cost=9.99).toppings.add(cheese)
+        Topping.objects.create(name="Ham")
+        path = self.write(
+            "menu.csv",
+            "type,name,cost,toppings\n"
+            "pizza,Plain,9.99,Cheese\n"
+            "pizza,Ham Pizza,9.99,Ham;Cheese\n"
+            "pizza,Another Ham Pizza,9.99,cheese;ham\n",
+        )
+        out, err = self.import_menu(path)
+
+        self.assertIn("line 2: Pizza with these Toppings already exists.", err)
+        self.assertIn("line 4: Pizza with these Toppings already exists.", err)
+        self.assertTrue(Pizza.objects.filter(name="Ham Pizza").exists())
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        path = self.write(
+            "menu.jsonl",
+            '{"type": "pizza", "name": "No Toppings", "cost": "5.00"}\n'
+            '{"type": "topping", "name": "Negative", "cost": "-1"}\n'
+            '{"type": "pizza", "name": "Ghost", "cost": "5.00", "toppings": ["x"]}\n'
+            "not json\n"
+            '{"type": "salad", "name": "Caesar"}\n',
+        )
+        out, err = self.import_menu(path)
+
+        self.assertIn("line 1: toppings:", err)
+        self.assertIn("line 2: additional_cost:", err)
+        self.assertIn("line 3: unknown toppings: x", err)
+        self.assertIn("line 4: invalid JSON", err)
+        self.assertIn("line 5: unknown row type 'salad'", err)
+        self.assertIn("(5 errors)", out)
+        self.assertFalse(Pizza.objects.exists())
+
+    def test_errors_are_reported_per_batch_and_only_counted(self):
+        reports = []
+        rows = read_jsonl_rows(
+            ['{"type": "salad"}\n', "not json\n", "[]\n", '{"type": "topping"}\n']
+        )
+        importer = MenuImporter(batch_size=2, report_errors=reports.append).run(rows)
+
+        self.assertEqual(
+            [[line for line, _ in errors] for errors in reports], [[1, 2], [3, 4]]
+        )
+        self.assertEqual(importer.error_count, 4)
+        self.assertEqual(importer.errors, [])
+
+    def test_import_query_count_is_independent_of_batch_rows(self):
+        def menu(count):
+            lines = ["type,name,cost,toppings", "topping,Cheese,,"]
+            lines += [f"topping,Topping {i},0.10," for i in range(count)]
+            lines += [f"pizza,Pizza {i},9.99,Cheese;Topping {i}" for i in range(count)]
+            return "\n".join(lines) + "\n"
+
+        with self.assertNumQueries(9):
+            self.import_menu(self.write("small.csv", menu(2)))
+        Pizza.objects.all().delete()
+        Topping.objects.all().delete()
+        with self.assertNumQueries(9):
+            self.import_menu(self.write("large.csv", menu(40)))
+
+    def test_unknown_format_raises_command_error(self):
+        with self.assertRaises(CommandError):
+            self.import_menu(self.write("menu.txt", ""))
+
+
+class ExportMenuCommandTests(TestCase):
+    def setUp(self):
+        cheese = Topping.objects.create(name="Cheese")
+        olives = Topping.objects.create(name="Olives", additional_cost="0.99")
+        pizza = Pizza.objects.create(name="Olive Pizza", cost="9.99")
+        pizza.toppings.add(cheese, olives)
+
+    def export_menu(self, *args):
+        out = StringIO()
+        call_command("export_menu", *args, stdout=out)
+        return out.getvalue()
+
+    def test_csv_export_lists_toppings_then_pizzas(self):
+        lines = self.export_menu().splitlines()
+
+        self.assertEqual(lines[0], "type,name,description,cost,toppings,total_cost")
+        self.assertEqual(lines[1], "topping,Cheese,,0.00,,")
+        self.assertEqual(lines[3], "pizza,Olive Pizza,,9.99,Cheese;Olives,10.98")
+
+    def test_jsonl_export_includes_totals(self):
+        rows = [
+            json.loads(line)
+            for line in self.export_menu("--format", "jsonl").splitlines()
+        ]
+
+        self.assertEqual(rows[2]["toppings"], ["Cheese", "Olives"])
+        self.assertEqual(rows[2]["total_cost"], "10.98")
+
+    def test_export_can_be_imported_again(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = str(Path(directory.name) / "menu.jsonl")
+        call_command("export_menu", "--format", "jsonl", "--output", path)
+        Pizza.objects.all().delete()
+        Topping.objects.all().delete()
+        call_command("import_menu", path, stdout=StringIO(), stderr=StringIO())
+
+        pizza = Pizza.objects.get(name="Olive Pizza")
+        self.assertEqual(pizza.toppings.count(), 2)
+
+    def test_export_query_count_is_per_chunk(self):
+        cheese = Topping.objects.get(name="Cheese")
+        for index in range(10):
+            Pizza.objects.create(name=f"Pizza {index}", cost=5).toppings.add(cheese)
+
+        with self.assertNumQueries(2 + 3):
+            self.export_menu("--chunk-size", "5")
+
+
+class DbDiagnosticsCommandTests(TestCase):
+    def test_prints_effective_sqlite_settings(self):
+        out = StringIO()
+        call_command("db_diagnostics", stdout=out)
+
+        self.assertIn("vendor: sqlite", out.getvalue())
+        self.assertIn("transaction_mode: IMMEDIATE", out.getvalue())
+        self.assertIn("synchronous: NORMAL", out.getvalue())
+        self.assertIn("busy_timeout: 5000", out.getvalue())
+
+
+class RebuildTotalCostsCommandTests(TestCase):
+    def setUp(self):
+        topping = Topping.objects.create(name="Olives", additional_cost="0.99")
+        self.pizza = Pizza.objects.create(name="Olive Pizza", cost="9.99")
+        self.pizza.toppings.add(topping)
+
+    def test_verify_reports_stale_totals(self):
+        Pizza.objects.update(total_cost="1.00")
+        err = StringIO()
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "rebuild_total_costs", "--verify", stdout=StringIO(), stderr=err
+            )
+        self.assertIn("Olive Pizza: stored 1.00, expected 10.98", err.getvalue())
+
+    def test_rebuild_fixes_stale_totals(self):
+        Pizza.objects.update(total_cost="1.00")
+        out = StringIO()
+        call_command("rebuild_total_costs", stdout=out)
+
+        self.pizza.refresh_from_db()
+        self.assertEqual(self.pizza.total_cost, Decimal("10.98"))
+        self.assertIn("Rebuilt total_cost for 1 pizza(s).", out.getvalue())
+        self.assertIn("All stored totals match.", out.getvalue())
+
+
+class BenchmarkPortalCommandTests(TestCase):
+    def test_reports_each_scenario_and_rolls_back(self):
+        out = StringIO()
+        call_command(
+            "benchmark_portal",
+            "--pizzas",
+            "5",
+            "--toppings",
+            "4",
+            "--iterations",
+            "2",
+            "--label",
+            "test",
+            stdout=out,
+        )
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        self.assertEqual(
+            [result["scenario"] for result in results],
+            [
+                "portal_view_cold",
+                "portal_view_warm",
+                "edit_view",
+                "pizza_form_clean",
+                "topping_delete",
+            ],
+        )
+        self.assertTrue(all(result["label"] == "test" for result in results))
+        self.assertTrue(all(result["p50_ms"] <= result["p99_ms"] for result in results))
+        self.assertFalse(Pizza.objects.exists())
+        self.assertFalse(Topping.objects.exists())
+
+    def test_seeded_pizzas_store_their_total_cost(self):
+        BenchmarkCommand().seed_menu(random.Random(1), 5, 4)
+
+        pizzas = Pizza.objects.with_total_cost()
+        self.assertEqual(len(pizzas), 5)
+        for pizza in pizzas:
+            self.assertEqual(pizza.total_cost, pizza.total)
+
+    def test_mismatched_sizes_raise_command_error(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark_portal", "--pizzas", "5,10", "--toppings", "4")
@@ -1,11 +1,15 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from ..models import Topping
+from ..models import Pizza, Topping
 
 
 class ContextProcessorTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.home_url = reverse("home")
         self.portal_url = reverse("portal")
@@ -20,9 +24,42 @@ class ContextProcessorTests(TestCase):
         self.assertNotIn("acct_type", context)
         self.assertNotIn("items", context)
 
+    def test_non_portal_pages_do_not_query_menu(self):
+        self.client.force_login(user=self.user)
+        for url in (reverse("login"), reverse("signup")):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+
+            self.assertEqual(response.context["acct_type"], "Owner")
+            self.assertNotIn("items", response.context)
+            self.assertFalse([query for query in queries if "portal_" in query["sql"]])
+
     def test_authenticated_user_has_context(self):
         self.client.force_login(user=self.user)
         response = self.client.get(self.portal_url)
         topping = Topping.objects.all()
         self.assertEqual(response.context["acct_type"], "Owner")
         self.assertQuerySetEqual(response.context["items"], topping)
+
+    def test_chef_portal_query_count_independent_of_menu_size(self):
+        chef = get_user_model().objects.create_user(
+            username="test_chef", password="test_password", account_type="chef"
+        )
+        topping = Topping.objects.get(name="sample_topping")
+        self.client.force_login(user=chef)
+
+        def create_pizzas(start, stop):
+            for index in range(start, stop):
+                pizza = Pizza.objects.create(name=f"Pizza {index}", cost=9.99)
+                pizza.toppings.add(topping)
+
+        # Load the session and user into the cache first.
+        self.client.get(reverse("login"))
+        create_pizzas(0, 2)
+        with CaptureQueriesContext(connection) as small_menu:
+            self.client.get(self.portal_url)
+        create_pizzas(2, 50)
+        with CaptureQueriesContext(connection) as large_menu:
+            self.client.get(self.portal_url)
+
+        self.assertEqual(len(small_menu), len(large_menu))
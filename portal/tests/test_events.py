@@ -0,0 +1,175 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.test import TestCase, AsyncClient, override_settings
+from django.urls import include, path, reverse
+from ..checks import check_event_backend
+from ..events import (
+    CacheEventBackend,
+    LocalEventBackend,
+    get_event_backend,
+    menu_event_stream,
+)
+from ..forms import BulkActionForm
+from ..menu_cache import get_menu_version
+from ..models import Pizza, Topping
+from ..urls import async_urlpatterns
+
+urlpatterns = [path("portal/", include(async_urlpatterns))]
+
+
+def parse_event(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+class InProcessCacheEventBackend(CacheEventBackend):
+    # LocMemCache increments atomically within the one test process.
+    atomic_incr_backends = {"django.core.cache.backends.locmem.LocMemCache"}
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class MenuEventTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = get_event_backend()
+        self.topping = Topping.objects.create(name="Cheese")
+
+    def capture_events(self):
+        events = []
+        backend = self.backend
+        original = backend.publish
+        backend.publish = events.append
+        self.addCleanup(setattr, backend, "publish", original)
+        return events
+
+    def test_model_changes_publish_on_commit(self):
+        events = self.capture_events()
+        with self.captureOnCommitCallbacks(execute=True):
+            pizza = Pizza.objects.create(name="Cheese Pizza", cost=9)
+            self.assertEqual(events, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            pizza.toppings.add(self.topping)
+
+        self.assertEqual(events[0]["pizzas"], [pizza.pk])
+        self.assertEqual(events[1]["toppings"], [self.topping.pk])
+        self.assertEqual(events[-1]["version"], get_menu_version())
+
+    def test_topping_delete_lists_the_pizzas_it_removes(self):
+        pizza = Pizza.objects.create(name="Cheese Pizza", cost=9)
+        pizza.toppings.add(self.topping)
+        topping_id = self.topping.pk
+        events = self.capture_events()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.topping.delete()
+
+        self.assertEqual(events[-1]["pizzas"], [pizza.pk])
+        self.assertEqual(events[-1]["toppings"], [topping_id])
+
+    def test_topping_price_change_lists_the_repriced_pizzas(self):
+        pizza = Pizza.objects.create(name="Cheese Pizza", cost=9)
+        pizza.toppings.add(self.topping)
+        Pizza.objects.create(name="Plain Pizza", cost=8)
+        events = self.capture_events()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.topping.additional_cost = "0.75"
+            self.topping.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.topping.name = "Mozzarella"
+            self.topping.save()
+
+        self.assertEqual(events[0]["pizzas"], [pizza.pk])
+        self.assertEqual(events[0]["toppings"], [self.topping.pk])
+        self.assertEqual(events[1]["pizzas"], [])
+
+    def test_bulk_topping_delete_lists_the_pizzas_it_removes(self):
+        pizza = Pizza.objects.create(name="Cheese Pizza", cost=9)
+        pizza.toppings.add(self.topping)
+        form = BulkActionForm("owner", {"items": [self.topping.pk], "action": "delete"})
+        self.assertTrue(form.is_valid())
+        events = self.capture_events()
+        with self.captureOnCommitCallbacks(execute=True):
+            form.save()
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["pizzas"], [pizza.pk])
+        self.assertEqual(events[0]["toppings"], [self.topping.pk])
+
+    def test_rolled_back_changes_publish_nothing(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.topping.delete()
+                raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+
+    async def test_local_backend_fans_out_to_subscribers(self):
+        backend = LocalEventBackend()
+        first, second = backend.subscribe(), backend.subscribe()
+
+        await sync_to_async(backend.publish)({"version": 1})
+
+        self.assertEqual(await asyncio.wait_for(first.get(), 1), {"version": 1})
+        self.assertEqual(await asyncio.wait_for(second.get(), 1), {"version": 1})
+        backend.unsubscribe(first)
+        self.assertEqual(list(backend.subscribers), [second])
+
+    @override_settings(PORTAL_EVENTS_POLL_INTERVAL=0.01)
+    async def test_cache_backend_delivers_events_from_other_workers(self):
+        subscriber, publisher = (
+            InProcessCacheEventBackend(),
+            InProcessCacheEventBackend(),
+        )
+        queue = subscriber.subscribe()
+        await asyncio.sleep(0.02)
+
+        await sync_to_async(publisher.publish)({"version": 2})
+
+        self.assertEqual(await asyncio.wait_for(queue.get(), 1), {"version": 2})
+        subscriber.unsubscribe(queue)
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": "/tmp/pizza-portal-events",
+            }
+        }
+    )
+    def test_cache_backend_requires_atomic_incr(self):
+        with self.assertRaises(ImproperlyConfigured):
+            CacheEventBackend()
+        with self.settings(PORTAL_EVENTS_BACKEND="portal.events.CacheEventBackend"):
+            errors = check_event_backend(None)
+        self.assertEqual([error.id for error in errors], ["portal.E001"])
+
+    async def test_event_stream_sends_version_then_changes(self):
+        response = await AsyncClient().get(reverse("menu_events"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+
+        await anext(stream)
+        self.assertEqual(
+            parse_event((await anext(stream)).decode()),
+            ("version", {"version": await sync_to_async(get_menu_version)()}),
+        )
+        await sync_to_async(self.backend.publish)(
+            {"version": 7, "pizzas": [1], "toppings": []}
+        )
+        self.assertEqual(
+            parse_event((await anext(stream)).decode()),
+            ("menu", {"version": 7, "pizzas": [1], "toppings": []}),
+        )
+
+    async def test_closed_stream_unsubscribes(self):
+        subscribers = len(self.backend.subscribers)
+        stream = menu_event_stream(1)
+        await anext(stream)
+        self.assertEqual(len(self.backend.subscribers), subscribers + 1)
+
+        await stream.aclose()
+
+        self.assertEqual(len(self.backend.subscribers), subscribers)
@@ -1,7 +1,13 @@
-from django.test import TestCase
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.http import HttpRequest
-from ..forms import PizzaForm, ToppingForm
-from ..models import Topping
+from ..forms import BulkActionForm, PizzaForm, ToppingForm
+from ..menu_cache import VERSION_KEY
+from ..models import Pizza, Topping
+from ..topping_index import get_topping_index
 
 
 class PizzaFormTests(TestCase):
@@ -204,6 +210,62 @@ class PizzaFormTests(TestCase):
 
         self.assertTrue(form.is_valid())
 
+    @override_settings(PORTAL_TOPPING_INDEX=True)
+    def test_duplicate_topping_check_ignores_a_stale_index(self):
+        index = get_topping_index()
+        pizza = Pizza.objects.create(name="Cheese Pizza", cost=9.99)
+        pizza.toppings.add(self.topping_instance)
+        # As seen by a worker that missed the version bump.
+        cache.set(VERSION_KEY, index.version, None)
+        self.assertIs(get_topping_index(), index)
+
+        form = PizzaForm(
+            {"name": "Other", "cost": 9.99, "toppings": [self.topping_instance.id]}
+        )
+
+        self.assertFalse(form.is_valid())
+
+    def test_duplicate_topping_check_is_independent_of_menu_size(self):
+        toppings = [Topping.objects.create(name=f"Topping {i}") for i in range(20)]
+        for index, topping in enumerate(toppings):
+            pizza = Pizza.objects.create(name=f"Pizza {index}", cost=9.99)
+            pizza.toppings.add(self.topping_instance, topping)
+        self.request.POST = {
+            "name": "Unique name",
+            "cost": 12.99,
+            "toppings": [self.topping_instance.id, toppings[5].id],
+        }
+        form = PizzaForm(self.request.POST)
+
+        with self.assertNumQueries(3):
+            self.assertFalse(form.is_valid())
+
+    def test_toppings_widget_renders_only_selected_toppings(self):
+        Topping.objects.bulk_create(
+            Topping(name=f"Topping {index}") for index in range(50)
+        )
+        pizza = Pizza.objects.create(name="Cheese Pizza", cost=9.99)
+        pizza.toppings.add(self.topping_instance)
+        form = PizzaForm(instance=pizza)
+
+        with self.assertNumQueries(1):
+            html = str(form["toppings"])
+
+        self.assertIn(f'value="{self.topping_instance.pk}" selected', html)
+        self.assertNotIn("Topping 0", html)
+        self.assertIn('data-autocomplete-url="/portal/api/toppings/"', html)
+
+    def test_toppings_widget_renders_submitted_toppings(self):
+        self.request.POST = {
+            "name": "",
+            "cost": 12.99,
+            "toppings": [str(self.topping_instance.id), "not-an-id"],
+        }
+        form = PizzaForm(self.request.POST)
+        form.is_valid()
+
+        self.assertIn("Cheese", str(form["toppings"]))
+
 
 class ToppingFormTests(TestCase):
     def setUp(self):
@@ -237,6 +299,22 @@ class ToppingFormTests(TestCase):
         with self.assertRaises(ValueError):
             form.save()
 
+    def test_duplicate_name_check_is_one_indexed_query(self):
+        Topping.objects.create(name="Olives")
+        form = ToppingForm({"name": "OLIVES"})
+
+        with self.assertNumQueries(1):
+            self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.non_field_errors(), ["Topping with this Name already exists."]
+        )
+
+    def test_renaming_instance_to_different_case_is_valid(self):
+        topping = Topping.objects.create(name="olives")
+        form = ToppingForm({"name": "Olives"}, instance=topping)
+
+        self.assertTrue(form.is_valid())
+
     def test_empty_additional_cost_is_valid(self):
         self.request.POST = {
             "name": "Fresh Mozzarella",
@@ -283,3 +361,88 @@ class ToppingFormTests(TestCase):
 
         self.assertTrue(form.is_valid())
         self.assertEqual(float(form.instance.additional_cost), 0.99)
+
+
+class BulkActionFormTests(TestCase):
+    def setUp(self):
+        self.toppings = [
+            Topping.objects.create(name=f"Topping {index}", additional_cost="1.00")
+            for index in range(30)
+        ]
+        self.pizzas = []
+        for index, topping in enumerate(self.toppings):
+            pizza = Pizza.objects.create(name=f"Pizza {index}", cost="10.00")
+            pizza.toppings.add(topping)
+            self.pizzas.append(pizza)
+
+    def apply(self, acct_type, items, action, amount=""):
+        form = BulkActionForm(
+            acct_type,
+            {"items": [item.pk for item in items], "action": action, "amount": amount},
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        with CaptureQueriesContext(connection) as queries:
+            form.save()
+        return len(queries)
+
+    def test_set_topping_cost_updates_toppings_and_pizza_totals(self):
+        self.apply("owner", self.toppings[:5], "set_cost", "2.50")
+
+        self.assertEqual(
+            set(
+                Topping.objects.filter(
+                    pk__in=[topping.pk for topping in self.toppings[:5]]
+                ).values_list("additional_cost", flat=True)
+            ),
+            {Decimal("2.50")},
+        )
+        self.pizzas[0].refresh_from_db()
+        self.pizzas[5].refresh_from_db()
+        self.assertEqual(self.pizzas[0].total_cost, Decimal("12.50"))
+        self.assertEqual(self.pizzas[5].total_cost, Decimal("11.00"))
+
+    def test_percentage_adjustment_rounds_to_cents(self):
+        self.apply("chef", self.pizzas[:2], "adjust_percent", "-12.5")
+
+        self.pizzas[0].refresh_from_db()
+        self.assertEqual(self.pizzas[0].cost, Decimal("8.75"))
+        self.assertEqual(self.pizzas[0].total_cost, Decimal("9.75"))
+
+    def test_deleting_toppings_deletes_their_pizzas(self):
+        self.apply("owner", self.toppings[:3], "delete")
+
+        self.assertEqual(Topping.objects.count(), 27)
+        self.assertEqual(Pizza.objects.count(), 27)
+
+    def test_query_count_is_independent_of_selection_size(self):
+        for acct_type, items in (("owner", self.toppings), ("chef", self.pizzas)):
+            for action, amount in (("set_cost", "3.00"), ("adjust_percent", "10")):
+                small = self.apply(acct_type, items[:2], action, amount)
+                large = self.apply(acct_type, items[2:], action, amount)
+                self.assertEqual(small, large)
+        small = self.apply("chef", self.pizzas[:2], "delete")
+        large = self.apply("chef", self.pizzas[2:10], "delete")
+        self.assertEqual(small, large)
+        small = self.apply("owner", self.toppings[10:12], "delete")
+        large = self.apply("owner", self.toppings[12:], "delete")
+        self.assertEqual(small, large)
+
+    def test_amount_is_required_for_cost_changes(self):
+        form = BulkActionForm(
+            "owner", {"items": [self.toppings[0].pk], "action": "set_cost"}
+        )
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("amount", form.errors)
+
+    def test_full_price_cut_is_rejected(self):
+        form = BulkActionForm(
+            "chef",
+            {
+                "items": [self.pizzas[0].pk],
+                "action": "adjust_percent",
+                "amount": "-100",
+            },
+        )
+
+        self.assertFalse(form.is_valid())
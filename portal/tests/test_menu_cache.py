@@ -0,0 +1,105 @@
+from decimal import Decimal
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from ..menu_cache import (
+    HITS_KEY,
+    flush_menu_cache_stats,
+    get_menu_grid,
+    get_menu_page,
+    get_menu_version,
+    menu_cache_stats,
+)
+from ..models import Pizza, Topping
+
+
+class MenuCacheTests(TestCase):
+    def setUp(self):
+        flush_menu_cache_stats()
+        cache.clear()
+        self.topping = Topping.objects.create(name="Cheese", additional_cost="0.50")
+        self.pizza = Pizza.objects.create(name="Cheese Pizza", cost="9.99")
+        self.pizza.toppings.add(self.topping)
+
+    def test_repeat_reads_are_served_from_cache(self):
+        get_menu_page("chef")
+
+        with self.assertNumQueries(0):
+            items, next_cursor = get_menu_page("chef")
+
+        self.assertEqual(items, [self.pizza])
+        self.assertEqual(menu_cache_stats()["hits"], 1)
+        self.assertEqual(menu_cache_stats()["misses"], 1)
+
+    def test_hits_are_counted_in_process_until_flushed(self):
+        get_menu_page("chef")
+        get_menu_page("chef")
+
+        self.assertIsNone(cache.get(HITS_KEY))
+        flush_menu_cache_stats()
+        self.assertEqual(cache.get(HITS_KEY), 1)
+
+    def test_roles_are_cached_separately(self):
+        self.assertEqual(get_menu_page("owner")[0], [self.topping])
+        self.assertEqual(get_menu_page("chef")[0], [self.pizza])
+
+    def test_cached_pizzas_keep_total_cost(self):
+        get_menu_page("chef")
+
+        self.assertEqual(get_menu_page("chef")[0][0].total_cost, Decimal("10.49"))
+
+    def test_saving_topping_bumps_version(self):
+        version = get_menu_version()
+        self.topping.additional_cost = "0.75"
+        self.topping.save()
+
+        self.assertGreater(get_menu_version(), version)
+
+    def test_deleting_pizza_bumps_version(self):
+        version = get_menu_version()
+        self.pizza.delete()
+
+        self.assertGreater(get_menu_version(), version)
+
+    def test_changing_pizza_toppings_bumps_version(self):
+        version = get_menu_version()
+        self.pizza.toppings.clear()
+
+        self.assertGreater(get_menu_version(), version)
+
+    def test_changes_are_visible_after_bump(self):
+        get_menu_page("owner")
+        olives = Topping.objects.create(name="Olives")
+
+        self.assertEqual(get_menu_page("owner")[0], [self.topping, olives])
+
+    def test_rendered_grid_is_served_from_cache(self):
+        grid = get_menu_grid("chef")
+
+        with self.assertNumQueries(0), self.assertTemplateNotUsed("portal_grid.html"):
+            self.assertEqual(get_menu_grid("chef"), grid)
+        self.assertIn("Cheese Pizza", grid)
+        self.assertNotIn("csrfmiddlewaretoken", grid)
+
+    def test_grid_is_rerendered_after_bump(self):
+        get_menu_grid("owner")
+        Topping.objects.create(name="Olives")
+
+        self.assertIn("Olives", get_menu_grid("owner"))
+
+    def test_flushed_cache_does_not_reuse_version(self):
+        version = get_menu_version()
+        cache.clear()
+
+        self.assertNotEqual(get_menu_version(), version)
+
+    def test_stats_command_reports_counters(self):
+        get_menu_page("chef")
+        get_menu_page("chef")
+        out = StringIO()
+        call_command("menu_cache_stats", stdout=out)
+
+        self.assertIn("hits: 1", out.getvalue())
+        self.assertIn("misses: 1", out.getvalue())
+        self.assertIn("hit rate: 50.0%", out.getvalue())
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from ..middleware import QueryBudgetExceeded
+from ..models import Topping
+
+INSTRUMENTED_MIDDLEWARE = [
+    "portal.middleware.QueryTimingMiddleware",
+    *settings.MIDDLEWARE,
+]
+
+INSTRUMENTED_TEMPLATES = [
+    {
+        **settings.TEMPLATES[0],
+        "BACKEND": "portal.instrumentation.InstrumentedDjangoTemplates",
+    }
+]
+
+
+@override_settings(MIDDLEWARE=INSTRUMENTED_MIDDLEWARE, TEMPLATES=INSTRUMENTED_TEMPLATES)
+class QueryTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.STATUS_OK = 200
+        self.client = Client()
+        self.portal_url = reverse("portal")
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_password",
+            account_type="owner",
+        )
+        Topping.objects.create(name="Cheese")
+        self.client.force_login(user=self.user)
+
+    def server_timing(self, response):
+        metrics = {}
+        for entry in response["Server-Timing"].split(", "):
+            name, *params = entry.split(";")
+            metrics[name] = dict(param.split("=", 1) for param in params)
+        return metrics
+
+    def test_server_timing_header_reports_queries_and_templates(self):
+        with self.assertLogs("portal.instrumentation", level="INFO") as logs:
+            response = self.client.get(self.portal_url)
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        metrics = self.server_timing(response)
+        self.assertEqual(set(metrics), {"db", "tpl", "ctx", "view", "total"})
+        self.assertRegex(metrics["db"]["desc"], r'^"[1-9]\d* queries"$')
+        self.assertGreater(float(metrics["tpl"]["dur"]), 0)
+        self.assertGreaterEqual(
+            float(metrics["total"]["dur"]), float(metrics["view"]["dur"])
+        )
+        timing = logs.records[0].timing
+        self.assertEqual(timing["path"], self.portal_url)
+        self.assertEqual(timing["status"], self.STATUS_OK)
+        self.assertGreater(timing["queries"], 0)
+
+    @override_settings(PORTAL_QUERY_BUDGET=1)
+    def test_query_budget_logs_warning(self):
+        with self.assertLogs("portal.instrumentation", level="WARNING") as logs:
+            response = self.client.get(self.portal_url)
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertIn("budget 1", logs.records[-1].getMessage())
+
+    @override_settings(PORTAL_QUERY_BUDGET=1, PORTAL_QUERY_BUDGET_STRICT=True)
+    def test_strict_query_budget_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(self.portal_url)
+
+    @override_settings(PORTAL_QUERY_BUDGET=100, PORTAL_QUERY_BUDGET_STRICT=True)
+    def test_request_within_budget_passes(self):
+        response = self.client.get(self.portal_url)
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
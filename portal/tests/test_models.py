@@ -1,6 +1,10 @@
+from decimal import Decimal
 from django.test import TestCase
+from django.db import connection
+from django.db.models import F
 from django.db.utils import IntegrityError
-from ..models import Topping, Pizza
+from django.test.utils import CaptureQueriesContext
+from ..models import Topping, Pizza, topping_fingerprint
 
 
 class ToppingTests(TestCase):
@@ -17,6 +21,10 @@ class ToppingTests(TestCase):
         with self.assertRaises(IntegrityError):
             Topping.objects.create(name=None)
 
+    def test_case_insensitive_duplicate_name_raises_integrity_error(self):
+        with self.assertRaises(IntegrityError):
+            Topping.objects.create(name="pepperoni")
+
     def test_additional_cost_persists(self):
         topping = Topping.objects.create(name="Marinara Sauce", additional_cost=1.99)
         self.assertEqual(topping.additional_cost, 1.99)
@@ -48,6 +56,50 @@ class ToppingTests(TestCase):
         with self.assertRaises(pizza.DoesNotExist):
             Pizza.objects.get(name="White Pizza")
 
+    def test_topping_deletion_keeps_unrelated_pizzas_and_toppings(self):
+        alfredo = Topping.objects.create(name="Alfredo Sauce")
+        pepperoni = Topping.objects.get(name="Pepperoni")
+        white_pizza = Pizza.objects.create(name="White Pizza", cost=11.99)
+        white_pizza.toppings.add(alfredo, pepperoni)
+        pepperoni_pizza = Pizza.objects.create(name="Pepperoni Pizza", cost=9.99)
+        pepperoni_pizza.toppings.add(pepperoni)
+        alfredo.delete()
+
+        self.assertFalse(Pizza.objects.filter(name="White Pizza").exists())
+        self.assertEqual(list(pepperoni_pizza.toppings.all()), [pepperoni])
+        self.assertEqual(
+            Pizza.toppings.through.objects.filter(topping=pepperoni).count(), 1
+        )
+
+    def test_topping_deletion_reports_deleted_pizzas(self):
+        topping = Topping.objects.create(name="Alfredo Sauce")
+        for index in range(3):
+            pizza = Pizza.objects.create(name=f"White Pizza {index}", cost=11.99)
+            pizza.toppings.add(topping)
+
+        self.assertEqual(topping.deletion_impact(), 3)
+        deleted, rows_per_model = topping.delete()
+
+        self.assertEqual(rows_per_model["portal.Pizza"], 3)
+        self.assertEqual(rows_per_model["portal.Topping"], 1)
+        self.assertEqual(deleted, 7)
+
+    def test_topping_deletion_query_count_independent_of_pizza_count(self):
+        small = Topping.objects.create(name="Basil")
+        large = Topping.objects.create(name="Garlic")
+        Pizza.objects.create(name="Basil Pizza", cost=9.99).toppings.add(small)
+        for index in range(30):
+            pizza = Pizza.objects.create(name=f"Garlic Pizza {index}", cost=9.99)
+            pizza.toppings.add(large)
+
+        with CaptureQueriesContext(connection) as small_delete:
+            small.delete()
+        with CaptureQueriesContext(connection) as large_delete:
+            large.delete()
+
+        self.assertEqual(len(small_delete), len(large_delete))
+        self.assertFalse(Pizza.objects.exists())
+
 
 class PizzaTests(TestCase):
     def setUp(self):
@@ -63,6 +115,10 @@ class PizzaTests(TestCase):
         with self.assertRaises(IntegrityError):
             Pizza.objects.create(name=None)
 
+    def test_case_insensitive_duplicate_name_raises_integrity_error(self):
+        with self.assertRaises(IntegrityError):
+            Pizza.objects.create(name="PEPPERONI PIZZA", cost="6.99")
+
     def test_description_persists(self):
         pizza = Pizza.objects.create(
             name="Descriptive Pizza", cost=12.50, description="14-inch cheese pizza"
@@ -91,7 +147,120 @@ class PizzaTests(TestCase):
         pizza = Pizza.objects.get(name="Pepperoni Pizza")
         pizza.toppings.add(pizza_toppings)
 
-        self.assertEqual(pizza.total_cost(), 7.24)
+        self.assertEqual(pizza.total_cost, Decimal("7.24"))
+        pizza.refresh_from_db()
+        self.assertEqual(pizza.total_cost, Decimal("7.24"))
+
+    def test_saving_pizza_cost_updates_total_cost(self):
+        pizza = Pizza.objects.get(name="Pepperoni Pizza")
+        pizza.toppings.add(self.topping_instance)
+        pizza.cost = "7.99"
+        pizza.save()
+        pizza.refresh_from_db()
+
+        self.assertEqual(pizza.total_cost, Decimal("8.24"))
+
+    def test_topping_cost_change_updates_every_total_in_one_query(self):
+        pizzas = [
+            Pizza.objects.create(name=f"Pizza {index}", cost="5.00")
+            for index in range(3)
+        ]
+        for pizza in pizzas:
+            pizza.toppings.add(self.topping_instance)
+        topping = Topping.objects.get(pk=self.topping_instance.pk)
+        topping.additional_cost = "1.00"
+
+        with CaptureQueriesContext(connection) as queries:
+            topping.save()
+
+        pizza_updates = [
+            query
+            for query in queries
+            if query["sql"].startswith('UPDATE "portal_pizza"')
+        ]
+        self.assertEqual(len(pizza_updates), 1)
+        self.assertEqual(
+            set(
+                Pizza.objects.filter(pk__in=[pizza.pk for pizza in pizzas]).values_list(
+                    "total_cost", flat=True
+                )
+            ),
+            {Decimal("6.00")},
+        )
+
+    def test_refreshed_totals_are_rounded_to_cents(self):
+        pizzas = [
+            Pizza.objects.create(name=f"Pizza {index}", cost="5.55")
+            for index in range(2)
+        ]
+        toppings = [
+            Topping.objects.create(name="Olives", additional_cost="0.20"),
+            Topping.objects.create(name="Basil", additional_cost="1.10"),
+        ]
+        for pizza in pizzas:
+            pizza.toppings.add(*toppings)
+        toppings[1].additional_cost = "1.15"
+        toppings[1].save()
+        Pizza.objects.filter(pk=pizzas[0].pk).refresh_total_costs()
+
+        matching = Pizza.objects.filter(total_cost__gte="6.90", total_cost__lte="6.90")
+        self.assertEqual(set(matching), set(pizzas))
+        stale = Pizza.objects.with_total_cost().exclude(total_cost=F("total"))
+        self.assertFalse(stale.exists())
+
+    def test_unchanged_topping_cost_skips_total_refresh(self):
+        topping = Topping.objects.get(pk=self.topping_instance.pk)
+        topping.name = "Spicy Pepperoni"
+
+        with CaptureQueriesContext(connection) as queries:
+            topping.save()
+
+        self.assertFalse(
+            [query for query in queries if '"portal_pizza"' in query["sql"]]
+        )
+
+    def test_reverse_topping_changes_update_total_cost(self):
+        pizza = Pizza.objects.get(name="Pepperoni Pizza")
+        self.topping_instance.pizza_set.add(pizza)
+        pizza.refresh_from_db()
+        self.assertEqual(pizza.total_cost, Decimal("7.24"))
+
+        self.topping_instance.pizza_set.clear()
+        pizza.refresh_from_db()
+        self.assertEqual(pizza.total_cost, Decimal("6.99"))
+
+    def test_filter_by_stored_total_cost(self):
+        pizza = Pizza.objects.get(name="Pepperoni Pizza")
+        pizza.toppings.add(self.topping_instance)
+        Pizza.objects.create(name="Deluxe Pizza", cost="19.99")
+
+        self.assertQuerySetEqual(
+            Pizza.objects.filter(total_cost__lt=15).order_by("total_cost"),
+            [pizza],
+        )
+
+    def test_with_total_cost_annotates_decimal_total(self):
+        pizza = Pizza.objects.get(name="Pepperoni Pizza")
+        pizza.toppings.add(self.topping_instance)
+        pizza.toppings.add(Topping.objects.create(name="Basil"))
+        annotated = Pizza.objects.with_total_cost().get(pk=pizza.pk)
+
+        self.assertEqual(annotated.total, Decimal("7.24"))
+
+    def test_with_total_cost_without_toppings_equals_cost(self):
+        annotated = Pizza.objects.with_total_cost().get(name="Pepperoni Pizza")
+
+        self.assertEqual(annotated.total, Decimal("6.99"))
+
+    def test_with_total_cost_uses_single_query(self):
+        for index in range(10):
+            pizza = Pizza.objects.create(name=f"Pizza {index}", cost="5.00")
+            pizza.toppings.add(self.topping_instance)
+
+        with self.assertNumQueries(1):
+            totals = [pizza.total for pizza in Pizza.objects.with_total_cost()]
+
+        self.assertIn(Decimal("5.25"), totals)
 
     def test_deletion_removes_from_database(self):
         pizza = Pizza.objects.create(name="Neapolitan Pizza", cost=8.99)
@@ -99,3 +268,49 @@ class PizzaTests(TestCase):
 
         with self.assertRaises(pizza.DoesNotExist):
             Pizza.objects.get(name="Neapolitan Pizza")
+
+    def test_topping_fingerprint_tracks_topping_changes(self):
+        olives = Topping.objects.create(name="Olives")
+        pizza = Pizza.objects.get(name="Pepperoni Pizza")
+        pizza.toppings.add(self.topping_instance, olives)
+        expected = topping_fingerprint([olives.pk, self.topping_instance.pk])
+
+        self.assertEqual(pizza.topping_fingerprint, expected)
+        pizza.refresh_from_db()
+        self.assertEqual(pizza.topping_fingerprint, expected)
+
+        pizza.toppings.remove(olives)
+        pizza.refresh_from_db()
+        self.assertEqual(
+            pizza.topping_fingerprint, topping_fingerprint([self.topping_instance.pk])
+        )
+
+        pizza.toppings.clear()
+        pizza.refresh_from_db()
+        self.assertEqual(pizza.topping_fingerprint, "")
+
+    def test_topping_fingerprint_tracks_reverse_changes(self):
+        pizza = Pizza.objects.get(name="Pepperoni Pizza")
+        self.topping_instance.pizza_set.add(pizza)
+        pizza.refresh_from_db()
+        self.assertEqual(
+            pizza.topping_fingerprint, topping_fingerprint([self.topping_instance.pk])
+        )
+
+        self.topping_instance.pizza_set.clear()
+        pizza.refresh_from_db()
+        self.assertEqual(pizza.topping_fingerprint, "")
+
+    def test_with_topping_set_matches_exact_combination(self):
+        olives = Topping.objects.create(name="Olives")
+        pizza = Pizza.objects.get(name="Pepperoni Pizza")
+        pizza.toppings.add(self.topping_instance, olives)
+
+        self.assertTrue(
+            Pizza.objects.with_topping_set([olives.pk, self.topping_instance.pk])
+            .filter(pk=pizza.pk)
+            .exists()
+        )
+        self.assertFalse(
+            Pizza.objects.with_topping_set([self.topping_instance.pk]).exists()
+        )
@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from ..models import Pizza, Topping
+from ..pagination import keyset_page
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        for name in ["pepperoni", "Olives", "onion", "Basil", "Garlic", "Pineapple"]:
+            Topping.objects.create(name=name)
+
+    def names(self, items):
+        return [item.name for item in items]
+
+    def test_items_are_ordered_case_insensitively(self):
+        items, next_cursor = keyset_page(Topping.objects.all(), page_size=10)
+
+        self.assertEqual(
+            self.names(items),
+            ["Basil", "Garlic", "Olives", "onion", "pepperoni", "Pineapple"],
+        )
+        self.assertEqual(next_cursor, "")
+
+    def test_cursor_walks_every_item_once(self):
+        seen = []
+        after = ""
+        while True:
+            items, after = keyset_page(Topping.objects.all(), after=after, page_size=4)
+            seen.extend(self.names(items))
+            if not after:
+                break
+
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(seen[4:], ["pepperoni", "Pineapple"])
+
+    def test_prefix_search_is_case_insensitive(self):
+        items, next_cursor = keyset_page(Topping.objects.all(), query="O")
+
+        self.assertEqual(self.names(items), ["Olives", "onion"])
+
+    def test_prefix_search_pages_with_cursor(self):
+        first, after = keyset_page(Topping.objects.all(), query="p", page_size=1)
+        second, last = keyset_page(
+            Topping.objects.all(), query="p", after=after, page_size=1
+        )
+
+        self.assertEqual(self.names(first), ["pepperoni"])
+        self.assertEqual(self.names(second), ["Pineapple"])
+        self.assertEqual(last, "")
+
+    def test_deep_page_uses_same_number_of_queries(self):
+        with self.assertNumQueries(1):
+            keyset_page(Topping.objects.all(), after="onion", page_size=2)
+
+
+@override_settings(PORTAL_PAGE_SIZE=2)
+class PortalPaginationViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.portal_url = reverse("portal")
+        self.user = get_user_model().objects.create_user(
+            username="test_chef", password="test_password", account_type="chef"
+        )
+        self.client.force_login(user=self.user)
+        topping = Topping.objects.create(name="Cheese")
+        for name in ["Margherita", "Hawaiian", "Diavola"]:
+            pizza = Pizza.objects.create(name=name, cost=9.99)
+            pizza.toppings.add(topping)
+
+    def test_first_page_links_to_next_page(self):
+        response = self.client.get(self.portal_url)
+
+        self.assertEqual(
+            [item.name for item in response.context["items"]],
+            ["Diavola", "Hawaiian"],
+        )
+        self.assertEqual(response.context["next_cursor"], "hawaiian")
+        self.assertContains(response, "after=hawaiian")
+
+    def test_next_page_continues_after_cursor(self):
+        response = self.client.get(self.portal_url, {"after": "hawaiian"})
+
+        self.assertEqual(
+            [item.name for item in response.context["items"]], ["Margherita"]
+        )
+        self.assertEqual(response.context["next_cursor"], "")
+
+    def test_search_filters_by_name_prefix(self):
+        response = self.client.get(self.portal_url, {"q": "ha"})
+
+        self.assertEqual(
+            [item.name for item in response.context["items"]], ["Hawaiian"]
+        )
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from ..models import Pizza, Topping
+from ..search import search_page, search_pizzas
+
+
+class SearchPizzasTests(TestCase):
+    def setUp(self):
+        self.basil = Topping.objects.create(name="Basil")
+        self.ham = Topping.objects.create(name="Ham")
+        self.margherita = Pizza.objects.create(
+            name="Margherita", description="Tomato, mozzarella and basil.", cost=9
+        )
+        self.margherita.toppings.add(self.basil)
+        self.hawaiian = Pizza.objects.create(
+            name="Hawaiian", description="Pineapple on a tomato base.", cost=11
+        )
+        self.hawaiian.toppings.add(self.ham)
+        self.basil_special = Pizza.objects.create(name="Basil Special", cost=12)
+        self.basil_special.toppings.add(self.ham)
+
+    def test_matches_name_description_and_toppings(self):
+        self.assertEqual(search_pizzas("pineapple"), [self.hawaiian])
+        self.assertEqual(search_pizzas("ham"), [self.basil_special, self.hawaiian])
+        self.assertEqual(search_pizzas("marg"), [self.margherita])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(search_pizzas("tomato basil"), [self.margherita])
+
+    def test_name_matches_rank_first(self):
+        self.assertEqual(search_pizzas("basil"), [self.basil_special, self.margherita])
+
+    def test_limit_caps_results(self):
+        self.assertEqual(len(search_pizzas("tomato", limit=1)), 1)
+
+    def test_pages_follow_rank_order(self):
+        first, cursor = search_page("tomato", page_size=1)
+        second, last_cursor = search_page("tomato", cursor, page_size=1)
+
+        self.assertEqual(first + second, search_pizzas("tomato"))
+        self.assertEqual(cursor, "1")
+        self.assertEqual(last_cursor, "")
+
+    def test_query_without_terms_returns_nothing(self):
+        self.assertEqual(search_pizzas(' "*( '), [])
+
+    def test_index_follows_pizza_changes(self):
+        self.hawaiian.description = "Smoked ham and pineapple."
+        self.hawaiian.save()
+        self.assertEqual(search_pizzas("smoked"), [self.hawaiian])
+
+        self.hawaiian.delete()
+        self.assertEqual(search_pizzas("smoked"), [])
+
+    def test_index_follows_topping_changes(self):
+        self.margherita.toppings.add(self.ham)
+        self.assertIn(self.margherita, search_pizzas("ham"))
+
+        self.ham.name = "Prosciutto"
+        self.ham.save()
+        self.assertEqual(len(search_pizzas("prosciutto")), 3)
+        self.assertEqual(search_pizzas("ham"), [])
+
+        self.margherita.toppings.remove(self.ham)
+        self.assertNotIn(self.margherita, search_pizzas("prosciutto"))
+
+
+class PortalSearchViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.portal_url = reverse("portal")
+        self.chef = get_user_model().objects.create_user(
+            username="test_chef", password="test_password", account_type="chef"
+        )
+        topping = Topping.objects.create(name="Mushroom")
+        self.pizza = Pizza.objects.create(
+            name="Funghi", description="Wild mushrooms.", cost=10
+        )
+        self.pizza.toppings.add(topping)
+
+    def test_chef_search_uses_full_text_index(self):
+        self.client.force_login(self.chef)
+        response = self.client.get(self.portal_url, {"q": "wild"})
+
+        self.assertEqual(list(response.context["items"]), [self.pizza])
+        self.assertEqual(response.context["next_cursor"], "")
+
+    @override_settings(PORTAL_PAGE_SIZE=1)
+    def test_chef_search_links_to_next_page(self):
+        other = Pizza.objects.create(name="Mushroom Feast", cost=12)
+        other.toppings.add(Topping.objects.get(name="Mushroom"))
+        self.client.force_login(self.chef)
+
+        response = self.client.get(self.portal_url, {"q": "mushroom"})
+        self.assertEqual(list(response.context["items"]), [other])
+        self.assertContains(response, "?q=mushroom&amp;after=1")
+
+        response = self.client.get(self.portal_url, {"q": "mushroom", "after": "1"})
+        self.assertEqual(list(response.context["items"]), [self.pizza])
+        self.assertEqual(response.context["next_cursor"], "")
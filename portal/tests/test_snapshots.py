@@ -0,0 +1,141 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ..models import MenuSnapshot, Pizza, Topping
+from ..snapshots import (
+    SnapshotError,
+    publish_menu,
+    read_current_snapshot,
+    rollback_menu,
+)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings_override = override_settings(PORTAL_SNAPSHOT_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.url = reverse("published_menu")
+        self.topping = Topping.objects.create(name="Olives", additional_cost=1)
+        self.pizza = Pizza.objects.create(name="Olive Pizza", cost=9)
+        self.pizza.toppings.add(self.topping)
+
+    def publish(self, keep=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return publish_menu(keep=keep)
+
+    def rollback(self, version=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return rollback_menu(version)
+
+    def test_publish_writes_compact_document(self):
+        snapshot = self.publish()
+        content = (self.directory / "current.json").read_text()
+        document = json.loads(content)
+
+        self.assertEqual(snapshot.version, 1)
+        self.assertTrue(snapshot.is_current)
+        self.assertEqual(content, snapshot.document)
+        self.assertNotIn(", ", content)
+        self.assertEqual(document["version"], 1)
+        self.assertEqual(document["pizzas"][0]["total_cost"], "10.00")
+        self.assertEqual(document["pizzas"][0]["toppings"], [self.topping.pk])
+        self.assertTrue((self.directory / "menu-1.json").exists())
+
+    def test_publish_keeps_only_recent_snapshots(self):
+        for _ in range(4):
+            self.publish(keep=2)
+
+        versions = list(MenuSnapshot.objects.values_list("version", flat=True))
+        self.assertEqual(versions, [4, 3, 2])
+        self.assertFalse((self.directory / "menu-1.json").exists())
+        self.assertEqual(MenuSnapshot.objects.get(is_current=True).version, 4)
+
+    def test_rollback_restores_previous_snapshot(self):
+        self.publish()
+        self.pizza.cost = 20
+        self.pizza.save()
+        self.publish()
+
+        snapshot = self.rollback()
+
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(MenuSnapshot.objects.get(is_current=True).version, 1)
+        document = json.loads((self.directory / "current.json").read_text())
+        self.assertEqual(document["pizzas"][0]["total_cost"], "10.00")
+
+    def test_rollback_without_earlier_snapshot_fails(self):
+        self.publish()
+        with self.assertRaises(SnapshotError):
+            rollback_menu()
+
+    def test_published_menu_view_runs_no_queries(self):
+        snapshot = self.publish()
+        read_current_snapshot()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.content.decode(), snapshot.document)
+        self.assertEqual(response["ETag"], f'"{snapshot.checksum}"')
+        self.assertEqual(len(queries), 0)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_file_is_restored_from_database(self):
+        snapshot = self.publish()
+        (self.directory / "current.json").unlink()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.content.decode(), snapshot.document)
+        self.assertTrue((self.directory / "current.json").exists())
+
+    def test_stale_file_is_replaced_after_publish_on_another_host(self):
+        self.publish()
+        read_current_snapshot()
+        # Another host publishes: the database and the shared cache move on,
+        # but this host's file still holds version 1.
+        with self.captureOnCommitCallbacks(execute=True), self.settings(
+            PORTAL_SNAPSHOT_DIR=str(self.directory / "other-host")
+        ):
+            snapshot = publish_menu()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.content.decode(), snapshot.document)
+        self.assertEqual(
+            (self.directory / "current.json").read_text(), snapshot.document
+        )
+
+    def test_unpublished_menu_is_not_found(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_publish_menu_command(self):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("publish_menu", stdout=out)
+            call_command("publish_menu", stdout=out)
+            call_command("publish_menu", "--rollback", stdout=out)
+        call_command("publish_menu", "--list", stdout=out)
+
+        self.assertIn("Published menu snapshot 2", out.getvalue())
+        self.assertIn("Rolled back to menu snapshot 1.", out.getvalue())
+        self.assertIn("* 1\t", out.getvalue())
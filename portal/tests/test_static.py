@@ -0,0 +1,102 @@
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.templatetags.static import static
+from ..middleware import StaticFilesMiddleware
+from ..storage import Image
+
+
+class StaticPipelineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.directory.cleanup)
+        cls.static_root = Path(cls.directory.name)
+        with override_settings(STATIC_ROOT=cls.directory.name):
+            call_command("collectstatic", interactive=False, verbosity=0)
+        manifest = json.loads((cls.static_root / "staticfiles.json").read_text())
+        cls.hashed = manifest["paths"]
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        settings_override = override_settings(STATIC_ROOT=self.directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse("view"))
+
+    def test_static_urls_use_content_hashed_names(self):
+        self.assertEqual(static("style.css"), f"/static/{self.hashed['style.css']}")
+
+    def test_collectstatic_writes_gzip_variants(self):
+        stylesheet = self.static_root / self.hashed["style.css"]
+        compressed = stylesheet.with_name(f"{stylesheet.name}.gz")
+
+        self.assertEqual(
+            gzip.decompress(compressed.read_bytes()), stylesheet.read_bytes()
+        )
+        self.assertFalse(
+            (self.static_root / f"{self.hashed['background.jpg']}.gz").exists()
+        )
+
+    def test_hashed_file_is_served_immutable_and_compressed(self):
+        request = self.factory.get(
+            f"/static/{self.hashed['style.css']}", HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+        response = self.middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_unhashed_file_is_revalidated(self):
+        response = self.middleware(self.factory.get("/static/style.css"))
+
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+    def test_unknown_and_escaping_paths_fall_through(self):
+        for path in ["/static/missing.css", "/static/../manage.py", "/portal/"]:
+            self.assertEqual(self.middleware(self.factory.get(path)).content, b"view")
+
+    async def test_async_middleware_serves_and_falls_through(self):
+        async def view(request):
+            return HttpResponse("view")
+
+        middleware = StaticFilesMiddleware(view)
+        response = await middleware(self.factory.get("/static/style.css"))
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+        response = await middleware(self.factory.get("/portal/"))
+        self.assertEqual(response.content, b"view")
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_background_variants_are_resized_and_referenced(self):
+        variant = self.hashed["background-640.jpg"]
+        with Image.open(self.static_root / variant) as image:
+            self.assertEqual(image.width, 640)
+
+        html = Template(
+            "{% load portal_static %}{% responsive_background 'background.jpg' %}"
+        ).render(Context())
+        self.assertIn(f"url('/static/{variant}')", html)
+
+
+class StaticFallbackTests(SimpleTestCase):
+    def test_urls_use_plain_names_before_collectstatic(self):
+        self.assertFalse(staticfiles_storage.hashed_files)
+        self.assertEqual(static("style.css"), "/static/style.css")
+
+    def test_responsive_background_renders_nothing_before_collectstatic(self):
+        html = Template(
+            "{% load portal_static %}{% responsive_background 'background.jpg' %}"
+        ).render(Context())
+        self.assertEqual(html, "")
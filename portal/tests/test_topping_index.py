@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from ..checks import check_topping_index
+from ..models import Pizza, Topping
+from ..topping_index import (
+    ToppingIndex,
+    get_topping_index,
+    pizzas_with_any_topping,
+)
+
+
+@override_settings(PORTAL_TOPPING_INDEX=True)
+class ToppingIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cheese = Topping.objects.create(name="Cheese")
+        self.olives = Topping.objects.create(name="Olives")
+        self.basil = Topping.objects.create(name="Basil")
+        self.margherita = self.create_pizza("Margherita", self.cheese, self.basil)
+        self.olive = self.create_pizza("Olive", self.cheese, self.olives)
+        self.plain = self.create_pizza("Plain", self.cheese)
+
+    def create_pizza(self, name, *toppings):
+        pizza = Pizza.objects.create(name=name, cost=9)
+        pizza.toppings.add(*toppings)
+        return pizza
+
+    def assert_answers(self):
+        olives, basil = self.olives.pk, self.basil.pk
+        self.assertEqual(
+            pizzas_with_any_topping([olives, basil]),
+            {self.margherita.pk, self.olive.pk},
+        )
+        self.assertEqual(pizzas_with_any_topping([olives]), {self.olive.pk})
+        unused = Topping.objects.create(name="Anchovies").pk
+        self.assertEqual(pizzas_with_any_topping([unused]), set())
+
+    def test_index_answers_combination_queries(self):
+        self.assert_answers()
+
+    @override_settings(PORTAL_TOPPING_INDEX=False)
+    def test_database_fallback_gives_the_same_answers(self):
+        self.assertIsNone(get_topping_index())
+        self.assert_answers()
+
+    def test_index_is_reused_until_the_menu_changes(self):
+        index = get_topping_index()
+        with self.assertNumQueries(0):
+            self.assertIs(get_topping_index(), index)
+
+        self.plain.toppings.add(self.olives)
+
+        self.assertIsNot(get_topping_index(), index)
+        self.assertEqual(
+            pizzas_with_any_topping([self.olives.pk]), {self.olive.pk, self.plain.pk}
+        )
+
+    def test_toppings_share_bits_densely(self):
+        index = ToppingIndex(1, [1, 2, 3], [(1, 40), (1, 7), (2, 7)])
+
+        self.assertEqual(sorted(index.bits.values()), [1, 2])
+        self.assertEqual(index.masks[3], 0)
+        self.assertEqual(index.with_any_topping([40]), {1})
+        self.assertFalse(hasattr(index, "__dict__"))
+
+    def test_deletion_impact_uses_index(self):
+        get_topping_index()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cheese.deletion_impact(), 3)
+
+    @override_settings(DEBUG=False)
+    def test_index_needs_a_shared_cache(self):
+        errors = check_topping_index(None)
+        self.assertEqual([error.id for error in errors], ["portal.E002"])
+
+        with self.settings(PORTAL_TOPPING_INDEX=False):
+            self.assertEqual(check_topping_index(None), [])
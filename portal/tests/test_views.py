@@ -1,8 +1,13 @@
-from django.test import TestCase, Client
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.urls.exceptions import NoReverseMatch
 from django.contrib.auth import get_user_model
+from ..forms import ToppingForm
 from ..models import Pizza, Topping
+from ..views import save_form
 
 
 class PortalViewTests(TestCase):
@@ -102,6 +107,24 @@ class AddViewTests(TestCase):
         self.assertEqual(response.status_code, self.STATUS_OK)
         self.assertTemplateUsed(response, "add.html")
 
+    def test_save_form_reports_name_taken_after_validation(self):
+        form = ToppingForm({"name": "Olives"})
+        self.assertTrue(form.is_valid())
+        Topping.objects.create(name="OLIVES")
+
+        self.assertFalse(save_form(form))
+        self.assertEqual(
+            form.non_field_errors(), ["Topping with this Name already exists."]
+        )
+
+    def test_save_form_raises_other_integrity_errors(self):
+        form = ToppingForm({"name": "Olives"})
+        self.assertTrue(form.is_valid())
+        form.instance.additional_cost = None
+
+        with self.assertRaises(IntegrityError):
+            save_form(form)
+
 
 class EditViewTests(TestCase):
     def setUp(self):
@@ -148,6 +171,24 @@ class EditViewTests(TestCase):
         self.assertEqual(response.status_code, self.STATUS_OK)
         self.assertTemplateUsed(response, "edit.html")
 
+    def test_GET_reuses_cached_portal_grid(self):
+        cache.clear()
+        self.client.force_login(self.chef_user)
+        self.client.get(reverse("portal"))
+        url = reverse("edit", kwargs={"item_id": self.pizza.id})
+        response = self.client.get(url)
+
+        self.assertTemplateNotUsed(response, "portal_grid.html")
+        self.assertContains(response, self.pizza.name)
+
+    def test_owner_GET_reports_pizzas_removed_by_delete(self):
+        self.client.force_login(self.owner_user)
+        url = reverse("edit", kwargs={"item_id": self.topping.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.context["deletion_impact"], 1)
+        self.assertContains(response, "will also delete 1 pizza.")
+
     def test_valid_chef_POST_redirected_to_portal(self):
         self.client.force_login(self.chef_user)
         data = {
@@ -271,3 +312,279 @@ class DeleteViewTests(TestCase):
 
         with self.assertRaises(NoReverseMatch):
             reverse("delete", kwargs={"item_id": -1})
+
+
+class BulkViewTests(TestCase):
+    def setUp(self):
+        self.STATUS_OK = 200
+        self.client = Client()
+        self.bulk_url = reverse("bulk")
+        self.owner_user = get_user_model().objects.create_user(
+            username="test_owner",
+            password="test_password",
+            account_type="owner",
+        )
+        self.cheese = Topping.objects.create(name="Cheese", additional_cost="1.00")
+        self.olives = Topping.objects.create(name="Olives", additional_cost="2.00")
+
+    def test_unauthenticated_user_redirected_to_login(self):
+        response = self.client.post(self.bulk_url)
+
+        self.assertRedirects(response, reverse("login"))
+
+    def test_valid_POST_applies_action_and_redirects(self):
+        self.client.force_login(self.owner_user)
+        data = {
+            "items": [self.cheese.id, self.olives.id],
+            "action": "adjust_percent",
+            "amount": "50",
+        }
+        response = self.client.post(self.bulk_url, data)
+
+        self.assertRedirects(response, reverse("portal"))
+        self.olives.refresh_from_db()
+        self.assertEqual(self.olives.additional_cost, Decimal("3.00"))
+
+    def test_invalid_POST_rerenders_portal_with_errors(self):
+        self.client.force_login(self.owner_user)
+        response = self.client.post(self.bulk_url, {"action": "delete"})
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertTemplateUsed(response, "portal.html")
+        self.assertTrue(response.context["bulk_form"].errors)
+        self.assertEqual(Topping.objects.count(), 2)
+
+    def test_grid_rows_have_bulk_checkboxes(self):
+        cache.clear()
+        self.client.force_login(self.owner_user)
+        response = self.client.get(reverse("portal"))
+
+        self.assertContains(
+            response,
+            f'name="items" value="{self.cheese.id}" form="bulk-form"',
+        )
+
+
+class FragmentViewTests(TestCase):
+    def setUp(self):
+        self.STATUS_OK = 200
+        self.client = Client()
+        self.owner_user = get_user_model().objects.create_user(
+            username="test_owner",
+            password="test_password",
+            account_type="owner",
+        )
+        self.chef_user = get_user_model().objects.create_user(
+            username="test_chef",
+            password="test_password",
+            account_type="chef",
+        )
+        self.topping = Topping.objects.create(name="Cheese")
+        self.pizza = Pizza.objects.create(name="Cheese Pizza", cost=9.99)
+        self.pizza.toppings.add(self.topping)
+        self.edit_url = reverse("edit_fragment", kwargs={"item_id": self.pizza.id})
+
+    def test_unauthenticated_user_redirected_to_login(self):
+        response = self.client.get(reverse("add_fragment"))
+
+        self.assertRedirects(response, reverse("login"))
+
+    def test_GET_edit_renders_only_the_form(self):
+        self.client.force_login(self.chef_user)
+        response = self.client.get(self.edit_url)
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertTemplateUsed(response, "edit_form.html")
+        self.assertTemplateNotUsed(response, "portal.html")
+        self.assertTemplateNotUsed(response, "portal_grid.html")
+        self.assertContains(response, "csrfmiddlewaretoken")
+        self.assertNotContains(response, "<html")
+
+    def test_valid_POST_edit_returns_updated_row(self):
+        self.client.force_login(self.chef_user)
+        data = {
+            "name": "Four Cheese",
+            "cost": "11.00",
+            "toppings": [self.topping.id],
+        }
+        response = self.client.post(self.edit_url, data)
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertTemplateUsed(response, "portal_item.html")
+        self.assertContains(response, f'data-item-id="{self.pizza.id}"')
+        self.assertContains(response, "Four Cheese")
+        self.assertContains(response, "($11.00)")
+
+    def test_invalid_POST_edit_returns_form_with_errors(self):
+        self.client.force_login(self.chef_user)
+        response = self.client.post(self.edit_url, {"name": "", "cost": "11.00"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTemplateUsed(response, "edit_form.html")
+
+    def test_valid_POST_add_returns_new_row(self):
+        self.client.force_login(self.owner_user)
+        data = {"name": "Olives", "additional_cost": "0.50"}
+        response = self.client.post(reverse("add_fragment"), data)
+
+        olives = Topping.objects.get(name="Olives")
+        self.assertEqual(response.status_code, 201)
+        self.assertContains(response, f'data-item-id="{olives.id}"', status_code=201)
+
+    def test_POST_delete_removes_item(self):
+        self.client.force_login(self.chef_user)
+        url = reverse("delete_fragment", kwargs={"item_id": self.pizza.id})
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response["X-Portal-Item"], str(self.pizza.id))
+        self.assertFalse(Pizza.objects.filter(pk=self.pizza.id).exists())
+
+    def test_GET_delete_not_allowed(self):
+        self.client.force_login(self.chef_user)
+        url = reverse("delete_fragment", kwargs={"item_id": self.pizza.id})
+
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+
+@override_settings(PORTAL_AUTOCOMPLETE_LIMIT=2)
+class ToppingSearchViewTests(TestCase):
+    def setUp(self):
+        self.STATUS_OK = 200
+        self.client = Client()
+        self.search_url = reverse("topping_search")
+        for name in ["Olives", "Onion", "Oregano", "Cheese"]:
+            Topping.objects.create(name=name)
+
+    def test_GET_returns_capped_prefix_matches(self):
+        response = self.client.get(self.search_url, {"q": "o"})
+        data = response.json()
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertEqual(
+            [topping["name"] for topping in data["results"]], ["Olives", "Onion"]
+        )
+        self.assertEqual(data["next"], "onion")
+
+    def test_GET_continues_after_cursor(self):
+        response = self.client.get(self.search_url, {"q": "O", "after": "onion"})
+
+        self.assertEqual(
+            [topping["name"] for topping in response.json()["results"]], ["Oregano"]
+        )
+        self.assertEqual(response.json()["next"], "")
+
+    def test_POST_not_allowed(self):
+        response = self.client.post(self.search_url)
+
+        self.assertEqual(response.status_code, 405)
+
+
+class MenuApiViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.STATUS_OK = 200
+        self.STATUS_NOT_MODIFIED = 304
+        self.client = Client()
+        self.api_url = reverse("menu_api")
+        self.cheese = Topping.objects.create(name="Cheese")
+        self.olives = Topping.objects.create(name="Olives", additional_cost="0.99")
+        self.pizza = Pizza.objects.create(name="Olive Pizza", cost="9.99")
+        self.pizza.toppings.add(self.cheese, self.olives)
+
+    def test_GET_returns_pizzas_and_toppings(self):
+        response = self.client.get(self.api_url)
+        data = response.json()
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertEqual(data["pizzas"][0]["name"], "Olive Pizza")
+        self.assertEqual(data["pizzas"][0]["total_cost"], "10.98")
+        self.assertEqual(
+            [topping["name"] for topping in data["pizzas"][0]["toppings"]],
+            ["Cheese", "Olives"],
+        )
+        self.assertEqual(data["toppings"][1]["additional_cost"], "0.99")
+
+    def test_response_carries_strong_etag(self):
+        response = self.client.get(self.api_url)
+
+        self.assertEqual(response["ETag"], f'"menu-{response.json()["version"]}"')
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.api_url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.api_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, self.STATUS_NOT_MODIFIED)
+
+    def test_menu_change_invalidates_etag(self):
+        etag = self.client.get(self.api_url)["ETag"]
+        self.olives.additional_cost = "1.49"
+        self.olives.save()
+        response = self.client.get(self.api_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertEqual(response.json()["pizzas"][0]["total_cost"], "11.48")
+
+    def test_menu_is_built_from_prefetched_queries(self):
+        for index in range(5):
+            pizza = Pizza.objects.create(name=f"Pizza {index}", cost="9.99")
+            pizza.toppings.add(self.cheese)
+        cache.clear()
+
+        with self.assertNumQueries(3):
+            self.client.get(self.api_url)
+
+    def test_POST_not_allowed(self):
+        response = self.client.post(self.api_url)
+
+        self.assertEqual(response.status_code, 405)
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        self.STATUS_OK = 200
+        self.client = Client()
+        self.staff_user = get_user_model().objects.create_user(
+            username="test_staff",
+            password="test_password",
+            account_type="owner",
+            is_staff=True,
+        )
+        self.chef_user = get_user_model().objects.create_user(
+            username="test_chef",
+            password="test_password",
+            account_type="chef",
+        )
+        topping = Topping.objects.create(name="Cheese")
+        Pizza.objects.create(name="Cheese Pizza", cost=9.99).toppings.add(topping)
+
+    def test_staff_GET_streams_csv(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(reverse("export", args=["csv"]))
+        content = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response.status_code, self.STATUS_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("pizza,Cheese Pizza,,9.99,Cheese,9.99", content)
+
+    def test_staff_GET_streams_jsonl(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(reverse("export", args=["jsonl"]))
+        content = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(len(content.splitlines()), 2)
+
+    def test_unknown_format_returns_404(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(reverse("export", args=["xml"]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_non_staff_user_redirected_to_admin_login(self):
+        self.client.force_login(self.chef_user)
+        response = self.client.get(reverse("export", args=["csv"]))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse("admin:login"), response["Location"])
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from .menu_cache import get_menu_version
+from .models import Pizza
+
+# The index loaded in this process for each database, replaced whenever the
+# menu version moves on.
+_indexes = {}
+
+
+class ToppingIndex:
+    """
+    Every pizza's toppings as an int bitset, so the edit page can tell how many
+    pizzas a topping delete would remove without an M2M join. Each topping used
+    by some pizza is given one bit.
+    """
+
+    __slots__ = ("version", "bits", "masks")
+
+    def __init__(self, version, pizza_ids, links):
+        self.version = version
+        self.bits = {}
+        self.masks = dict.fromkeys(pizza_ids, 0)
+        for pizza_id, topping_id in links:
+            bit = self.bits.setdefault(topping_id, 1 << len(self.bits))
+            self.masks[pizza_id] = self.masks.get(pizza_id, 0) | bit
+
+    @classmethod
+    def load(cls, version, using=DEFAULT_DB_ALIAS):
+        pizza_ids = Pizza.objects.using(using).values_list("pk", flat=True)
+        links = Pizza.toppings.through.objects.using(using).values_list(
+            "pizza_id", "topping_id"
+        )
+        return cls(version, pizza_ids.iterator(), links.iterator())
+
+    def with_any_topping(self, topping_ids):
+        mask = 0
+        for topping_id in topping_ids:
+            mask |= self.bits.get(topping_id, 0)
+        return {pk for pk, pizza_mask in self.masks.items() if pizza_mask & mask}
+
+
+def get_topping_index(using=DEFAULT_DB_ALIAS):
+    """
+    Return the index for the current menu version, loading it if the menu has
+    changed, or ``None`` when PORTAL_TOPPING_INDEX is off.
+    """
+    if not settings.PORTAL_TOPPING_INDEX:
+        return None
+    # Read the version before the rows, so a change made while loading moves
+    # the version past this index.
+    version = get_menu_version()
+    index = _indexes.get(using)
+    if index is None or index.version != version:
+        index = _indexes[using] = ToppingIndex.load(version, using)
+    return index
+
+
+def pizzas_with_any_topping(topping_ids, using=DEFAULT_DB_ALIAS):
+    """Return the ids of pizzas that have at least one of ``topping_ids``."""
+    index = get_topping_index(using)
+    if index is not None:
+        return index.with_any_topping(topping_ids)
+    links = Pizza.toppings.through.objects.using(using)
+    return set(links.filter(topping__in=topping_ids).values_list("pizza_id", flat=True))
@@ -1,9 +1,52 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
-urlpatterns = [
-    path("", views.portal_view, name="portal"),
-    path("<int:item_id>/edit/", views.edit_view, name="edit"),
-    path("add/", views.add_view, name="add"),
-    path("<int:item_id>/delete/", views.delete_view, name="delete"),
+menu_urlpatterns = [
+    path("api/menu/", views.menu_api_view, name="menu_api"),
+    path("api/menu/published/", views.published_menu_view, name="published_menu"),
+    path("api/toppings/", views.topping_search_view, name="topping_search"),
 ]
+
+# Served by the sync views in both modes; each is one small response.
+fragment_urlpatterns = [
+    path("add/fragment/", views.add_fragment_view, name="add_fragment"),
+    path(
+        "<int:item_id>/edit/fragment/", views.edit_fragment_view, name="edit_fragment"
+    ),
+    path(
+        "<int:item_id>/delete/fragment/",
+        views.delete_fragment_view,
+        name="delete_fragment",
+    ),
+]
+
+sync_urlpatterns = (
+    [
+        path("", views.portal_view, name="portal"),
+        path("<int:item_id>/edit/", views.edit_view, name="edit"),
+        path("add/", views.add_view, name="add"),
+        path("<int:item_id>/delete/", views.delete_view, name="delete"),
+        path("bulk/", views.bulk_view, name="bulk"),
+        path("export/menu.<str:export_format>", views.export_view, name="export"),
+    ]
+    + menu_urlpatterns
+    + fragment_urlpatterns
+)
+
+async_urlpatterns = (
+    [
+        path("", views.aportal_view, name="portal"),
+        path("<int:item_id>/edit/", views.aedit_view, name="edit"),
+        path("add/", views.aadd_view, name="add"),
+        path("<int:item_id>/delete/", views.adelete_view, name="delete"),
+        path("bulk/", views.bulk_view, name="bulk"),
+        # Long-lived streams only scale on the async app.
+        path("api/menu/events/", views.menu_events_view, name="menu_events"),
+        path("export/menu.<str:export_format>", views.aexport_view, name="export"),
+    ]
+    + menu_urlpatterns
+    + fragment_urlpatterns
+)
+
+urlpatterns = async_urlpatterns if settings.PORTAL_ASYNC_VIEWS else sync_urlpatterns
@@ -1,15 +1,104 @@
-from django.http import HttpResponseRedirect
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import IntegrityError, transaction
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.conf import settings
 from django.urls import reverse_lazy
-from django.shortcuts import render, get_object_or_404
+from django.middleware.csrf import get_token
+from django.shortcuts import render, get_object_or_404, aget_object_or_404
+from django.template.loader import get_template
+from django.views.decorators.http import condition, require_POST, require_safe
 from .models import Pizza, Topping
-from .forms import PizzaForm, ToppingForm
+from .forms import BulkActionForm, PizzaForm, ToppingForm
+from .menu_export import EXPORT_FORMATS, aexport_menu, export_menu
+from .pagination import keyset_page
+from .events import menu_event_stream
+from .menu_cache import (
+    aget_menu_grid,
+    aget_menu_version,
+    get_menu_document,
+    get_menu_grid,
+    get_menu_version,
+)
+from .snapshots import read_current_snapshot
+
+
+def portal_page_params(request):
+    return request.GET.get("q", "").strip(), request.GET.get("after", "")
+
+
+def save_form(form):
+    try:
+        with transaction.atomic():
+            form.save()
+    except IntegrityError as error:
+        # Another request saved the same name after this form was validated;
+        # report it where validation reports the same constraint.
+        opts = form._meta.model._meta
+        constraint = next(
+            constraint
+            for constraint in opts.constraints
+            if constraint.name == f"{opts.db_table}_lower_name_unique"
+        )
+        if constraint.name not in str(error):
+            raise
+        form.add_error(None, constraint.get_violation_error_message())
+        return False
+    return True
+
+
+def render_portal(request, template_name, context):
+    query, after = portal_page_params(request)
+    # The grid is cached as rendered HTML, so pages that only show a form
+    # don't fetch or re-render the menu.
+    grid = get_menu_grid(request.user.account_type, query, after)
+    context.update({"grid": grid, "query": query})
+    context.setdefault("bulk_form", BulkActionForm(request.user.account_type))
+    return render(request, template_name, context)
+
+
+async def arender_portal(request, template_name, context, renders_form=False):
+    query, after = portal_page_params(request)
+    grid = await aget_menu_grid(request.user.account_type, query, after)
+    context.update({"grid": grid, "query": query})
+    context.setdefault("bulk_form", BulkActionForm(request.user.account_type))
+    if renders_form:
+        # Form widgets query their choices while the template renders.
+        return await sync_to_async(render)(request, template_name, context)
+    return render(request, template_name, context)
+
+
+def portal_form(acct_type, data=None, instance=None):
+    form_class = ToppingForm if acct_type == "owner" else PizzaForm
+    return form_class(data, instance=instance)
+
+
+def render_fragment(request, template_name, context, status=200):
+    # Fragments skip the context processors; the CSRF token is the only
+    # request state their forms need.
+    context["csrf_token"] = get_token(request)
+    html = get_template(template_name).render(context)
+    return HttpResponse(html, status=status)
+
+
+async def aget_user(request):
+    user = await request.auser()
+    # Templates and context processors read request.user synchronously.
+    request.user = user
+    return user
 
 
 def portal_view(request):
     if not request.user.is_authenticated:
         return HttpResponseRedirect(reverse_lazy("login"))
 
-    return render(request, "portal.html", {})
+    return render_portal(request, "portal.html", {})
 
 
 def add_view(request):
@@ -24,12 +113,11 @@ def add_view(request):
             else PizzaForm(request.POST)
         )
 
-        if form.is_valid():
-            form.save()
+        if form.is_valid() and save_form(form):
             return HttpResponseRedirect(reverse_lazy("portal"))
     else:
         form = ToppingForm() if acct_type == "owner" else PizzaForm()
-    return render(request, "add.html", {"form": form})
+    return render_portal(request, "add.html", {"form": form})
 
 
 def edit_view(request, item_id):
@@ -47,10 +135,7 @@ def edit_view(request, item_id):
             else PizzaForm(request.POST, instance=item)
         )
 
-        if form.is_valid():
-            item = form.save(commit=False)
-            form.save_m2m()
-            item.save()
+        if form.is_valid() and save_form(form):
             return HttpResponseRedirect(reverse_lazy("portal"))
     else:
         form = (
@@ -63,7 +148,9 @@ def edit_view(request, item_id):
         "item": item,
         "form": form,
     }
-    return render(request, "edit.html", context)
+    if acct_type == "owner":
+        context["deletion_impact"] = item.deletion_impact()
+    return render_portal(request, "edit.html", context)
 
 
 def delete_view(request, item_id):
@@ -78,3 +165,216 @@ def delete_view(request, item_id):
         item.delete()
 
     return HttpResponseRedirect(reverse_lazy("portal"))
+
+
+async def aportal_view(request):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return HttpResponseRedirect(reverse_lazy("login"))
+
+    return await arender_portal(request, "portal.html", {})
+
+
+async def aadd_view(request):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return HttpResponseRedirect(reverse_lazy("login"))
+
+    acct_type = user.account_type
+    if request.method == "POST":
+        form = (
+            ToppingForm(request.POST)
+            if acct_type == "owner"
+            else PizzaForm(request.POST)
+        )
+
+        save_if_valid = sync_to_async(lambda: form.is_valid() and save_form(form))
+        if await save_if_valid():
+            return HttpResponseRedirect(reverse_lazy("portal"))
+    else:
+        form = ToppingForm() if acct_type == "owner" else PizzaForm()
+    return await arender_portal(request, "add.html", {"form": form}, renders_form=True)
+
+
+async def aedit_view(request, item_id):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return HttpResponseRedirect(reverse_lazy("login"))
+
+    acct_type = user.account_type
+    obj = Topping if acct_type == "owner" else Pizza
+    item = await aget_object_or_404(obj, pk=item_id)
+    form_class = ToppingForm if acct_type == "owner" else PizzaForm
+    data = request.POST if request.method == "POST" else None
+    # Binding an instance reads its current toppings from the database.
+    form = await sync_to_async(form_class)(data, instance=item)
+
+    save_if_valid = sync_to_async(lambda: form.is_valid() and save_form(form))
+    if form.is_bound and await save_if_valid():
+        return HttpResponseRedirect(reverse_lazy("portal"))
+
+    context = {
+        "item": item,
+        "form": form,
+    }
+    if acct_type == "owner":
+        context["deletion_impact"] = await sync_to_async(item.deletion_impact)()
+    return await arender_portal(request, "edit.html", context, renders_form=True)
+
+
+async def adelete_view(request, item_id):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return HttpResponseRedirect(reverse_lazy("login"))
+
+    if request.method == "POST":
+        acct_type = user.account_type
+        obj = Topping if acct_type == "owner" else Pizza
+        item = await aget_object_or_404(obj, pk=item_id)
+
+        await item.adelete()
+
+    return HttpResponseRedirect(reverse_lazy("portal"))
+
+
+@require_POST
+def bulk_view(request):
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect(reverse_lazy("login"))
+
+    form = BulkActionForm(request.user.account_type, request.POST)
+    if form.is_valid():
+        form.save()
+        return HttpResponseRedirect(reverse_lazy("portal"))
+    return render_portal(request, "portal.html", {"bulk_form": form})
+
+
+def add_fragment_view(request):
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect(reverse_lazy("login"))
+
+    data = request.POST if request.method == "POST" else None
+    form = portal_form(request.user.account_type, data)
+    if not form.is_bound:
+        return render_fragment(request, "add_form.html", {"form": form})
+    if form.is_valid() and save_form(form):
+        return render_fragment(
+            request, "portal_item.html", {"item": form.instance}, status=201
+        )
+    return render_fragment(request, "add_form.html", {"form": form}, status=400)
+
+
+def edit_fragment_view(request, item_id):
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect(reverse_lazy("login"))
+
+    acct_type = request.user.account_type
+    obj = Topping if acct_type == "owner" else Pizza
+    item = get_object_or_404(obj, pk=item_id)
+    data = request.POST if request.method == "POST" else None
+    form = portal_form(acct_type, data, instance=item)
+    if form.is_bound and form.is_valid() and save_form(form):
+        return render_fragment(request, "portal_item.html", {"item": form.instance})
+
+    context = {
+        "item": item,
+        "form": form,
+    }
+    if acct_type == "owner":
+        context["deletion_impact"] = item.deletion_impact()
+    status = 400 if form.is_bound else 200
+    return render_fragment(request, "edit_form.html", context, status)
+
+
+@require_POST
+def delete_fragment_view(request, item_id):
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect(reverse_lazy("login"))
+
+    obj = Topping if request.user.account_type == "owner" else Pizza
+    item = get_object_or_404(obj, pk=item_id)
+    item.delete()
+
+    response = HttpResponse(status=204)
+    response["X-Portal-Item"] = item_id
+    return response
+
+
+def menu_etag(request):
+    return f'"menu-{get_menu_version()}"'
+
+
+@require_safe
+@condition(etag_func=menu_etag)
+def menu_api_view(request):
+    return JsonResponse(get_menu_document())
+
+
+def published_menu_etag(request):
+    snapshot = read_current_snapshot()
+    return f'"{snapshot[1]}"' if snapshot else None
+
+
+@require_safe
+@condition(etag_func=published_menu_etag)
+def published_menu_view(request):
+    snapshot = read_current_snapshot()
+    if snapshot is None:
+        raise Http404("No menu has been published.")
+    return HttpResponse(snapshot[0], content_type="application/json")
+
+
+@require_safe
+async def menu_events_view(request):
+    version = await aget_menu_version()
+    response = StreamingHttpResponse(
+        menu_event_stream(version), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@require_safe
+def topping_search_view(request):
+    query, after = portal_page_params(request)
+    toppings = Topping.objects.only("pk", "name", "additional_cost")
+    limit = settings.PORTAL_AUTOCOMPLETE_LIMIT
+    results, next_cursor = keyset_page(toppings, query, after, limit)
+    return JsonResponse(
+        {
+            "results": [
+                {"id": topping.pk, "name": topping.name, "label": str(topping)}
+                for topping in results
+            ],
+            "next": next_cursor,
+        }
+    )
+
+
+@require_safe
+@staff_member_required
+def export_view(request, export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise Http404("Unknown export format.")
+
+    _, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        export_menu(export_format), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="menu.{export_format}"'
+    return response
+
+
+@require_safe
+@staff_member_required
+async def aexport_view(request, export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise Http404("Unknown export format.")
+
+    _, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        aexport_menu(export_format), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="menu.{export_format}"'
+    return response
@@ -0,0 +1,37 @@
+from django import forms
+from django.urls import reverse
+
+
+class ToppingAutocompleteWidget(forms.SelectMultiple):
+    """
+    Multiple select that renders only the selected toppings. The rest of the
+    catalogue is searched through the topping autocomplete endpoint, so the
+    rendered form doesn't grow with the number of toppings.
+    """
+
+    class Media:
+        js = ["portal/autocomplete.js"]
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-autocomplete-url"] = reverse("topping_search")
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        selected_ids = [pk for pk in value if str(pk).isdigit()]
+        if not selected_ids:
+            return []
+
+        toppings = self.choices.queryset.filter(pk__in=selected_ids).order_by("name")
+        options = [
+            self.create_option(
+                name,
+                self.choices.field.prepare_value(topping),
+                self.choices.field.label_from_instance(topping),
+                True,
+                index,
+                attrs=attrs,
+            )
+            for index, topping in enumerate(toppings)
+        ]
+        return [(None, options, 0)]